@@ -13,8 +13,7 @@ class BaseTokenListFactory(factory.django.DjangoModelFactory):
             return
 
         if tokens:
-            for token in tokens:
-                self.tokens.add(token)
+            self.tokens.add(*tokens)
 
 
 class TokenListFactory(BaseTokenListFactory):
@@ -0,0 +1,30 @@
+# Generated by Django 4.0.5 on 2026-10-17 12:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="basetoken",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="text_pattern_ops"
+                ),
+                name="token_name_prefix_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="basetoken",
+            index=models.Index(
+                django.db.models.functions.text.Upper("symbol"), name="token_symbol_upper_idx"
+            ),
+        ),
+    ]
@@ -36,7 +36,7 @@ class PaymentNetworkProvider(BaseModel, PolymorphicModelMixin):
 
     def activate(self):
         self.is_active = True
-        self.save()
+        self.save(update_fields=["is_active"])
 
     def __str__(self):
         return f"{self.subclassed.__class__.__name__} for {self.network.subclassed.name}"
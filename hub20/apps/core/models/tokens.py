@@ -5,8 +5,10 @@ from decimal import Decimal
 from typing import TypeVar
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
 from django.db.models import Sum
+from django.db.models.functions import Upper
 from model_utils.managers import InheritanceManager
 
 from ..choices import CURRENCIES
@@ -62,6 +64,16 @@ class BaseToken(BaseModel, PolymorphicModelMixin):
     def __str__(self):
         return self.name
 
+    class Meta:
+        # Token search filters with istartswith on the name and iexact on the
+        # symbol, which postgres runs as UPPER(...) LIKE/= comparisons.
+        indexes = [
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"), name="token_name_prefix_idx"
+            ),
+            models.Index(Upper("symbol"), name="token_symbol_upper_idx"),
+        ]
+
 
 class WrappedToken(models.Model):
     """
@@ -139,6 +139,16 @@ class InternalTransfer(Transfer):
         TransferConfirmation.objects.create(transfer=self)
 
 
+class TransferExecution(BaseModel, TimeStampedModel):
+    """
+    Marks a transfer as claimed by a worker. It is committed before the
+    transfer is executed, so the transfer is never sent twice even if the
+    worker dies before its outcome is recorded.
+    """
+
+    transfer = models.OneToOneField(Transfer, on_delete=models.CASCADE, related_name="execution")
+
+
 class TransferReceipt(BaseModel, TimeStampedModel):
     transfer = models.OneToOneField(Transfer, on_delete=models.CASCADE, related_name="receipt")
 
@@ -166,6 +176,7 @@ __all__ = [
     "TransferFailure",
     "TransferCancellation",
     "TransferConfirmation",
+    "TransferExecution",
     "TransferReceipt",
     "TransferError",
     "InternalTransfer",
@@ -1,7 +1,12 @@
+from typing import Tuple
+
 from rest_framework import serializers
 
 
 class PolymorphicModelSerializer(serializers.ModelSerializer):
+    # Relations read by the serializer, loaded for all listed objects at once
+    related_lookups: Tuple[str, ...] = ()
+
     @classmethod
     def get_subclassed_serializer(cls, obj):
         """
@@ -6,10 +6,11 @@ from celery import shared_task
 from channels.layers import get_channel_layer
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.models import Session
+from django.db.transaction import atomic
 from django.utils import timezone
 
 from .consumers import CheckoutConsumer, PaymentNetworkEventsConsumer
-from .models import Checkout, Transfer
+from .models import Checkout, Transfer, TransferExecution
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -24,17 +25,32 @@ def broadcast_event(event, **event_data):
 
 @shared_task
 def execute_transfer(transfer_id):
-    try:
-        transfer = Transfer.pending.get_subclass(id=transfer_id)
-        transfer.execute()
-    except Transfer.DoesNotExist:
-        logger.warning(f"Transfer {transfer_id} not found or already confirmed")
+    # The row is locked only for as long as it takes to claim the transfer.
+    # The claim is committed before anything is sent, so concurrent workers
+    # (and later runs) skip the transfer and no lock is held during execution.
+    with atomic():
+        try:
+            transfer = (
+                Transfer.pending.filter(execution__isnull=True)
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("sender__account", "currency")
+                .get_subclass(id=transfer_id)
+            )
+            TransferExecution.objects.create(transfer=transfer)
+        except Transfer.DoesNotExist:
+            logger.warning(f"Transfer {transfer_id} not found, already confirmed or in progress")
+            return
+
+    transfer.execute()
 
 
 @shared_task
 def execute_pending_transfers():
-    for transfer in Transfer.pending.exclude(execute_on__gt=timezone.now()).select_subclasses():
-        transfer.execute()
+    pending = Transfer.pending.filter(execution__isnull=True).exclude(
+        execute_on__gt=timezone.now()
+    )
+    for transfer_id in pending.values_list("id", flat=True):
+        execute_transfer(transfer_id)
 
 
 @shared_task
@@ -7,7 +7,8 @@ from hub20.apps.core.factories import (
     PaymentConfirmationFactory,
     UserAccountFactory,
 )
-from hub20.apps.core.models import Transfer, TransferConfirmation
+from hub20.apps.core.models import Transfer, TransferConfirmation, TransferExecution
+from hub20.apps.core.tasks import execute_transfer
 
 
 class BaseTransferTestCase(TestCase):
@@ -93,6 +94,30 @@ class InternalTransferTestCase(TransferModelTestCase):
         self.assertTrue(transfer.is_finalized)
         self.assertEqual(transfer.status, TRANSFER_STATUS.failed)
 
+    def test_execute_transfer_task_claims_transfer(self):
+        transfer = InternalTransferFactory(
+            sender=self.sender,
+            receiver=self.receiver,
+            currency=self.credit.currency,
+            amount=self.credit.amount,
+        )
+
+        execute_transfer(transfer.id)
+        self.assertTrue(TransferExecution.objects.filter(transfer=transfer).exists())
+        self.assertEqual(transfer.status, TRANSFER_STATUS.confirmed)
+
+    def test_execute_transfer_task_skips_claimed_transfers(self):
+        transfer = InternalTransferFactory(
+            sender=self.sender,
+            receiver=self.receiver,
+            currency=self.credit.currency,
+            amount=self.credit.amount,
+        )
+        TransferExecution.objects.create(transfer=transfer)
+
+        execute_transfer(transfer.id)
+        self.assertFalse(transfer.is_finalized)
+
 
 __all__ = [
     "BaseTransferTestCase",
@@ -1,3 +1,6 @@
+from collections import defaultdict
+
+from django.db.models import prefetch_related_objects
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -17,13 +20,21 @@ class PolymorphicModelViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin
         return self.serializer_class
 
     def _serialize_queryset(self, qs, request):
-        serializer_subclasses = self.serializer_class.__subclasses__()
+        serializer_classes = {s.Meta.model: s for s in self.serializer_class.__subclasses__()}
+        objects = list(qs)
+
+        objects_by_model = defaultdict(list)
+        for obj in objects:
+            objects_by_model[type(obj)].append(obj)
+
+        for model, model_objects in objects_by_model.items():
+            serializer_class = serializer_classes.get(model, self.serializer_class)
+            lookups = getattr(serializer_class, "related_lookups", ())
+            prefetch_related_objects(model_objects, *lookups)
+
         data = []
-        for obj in qs:
-            model = type(obj)
-            serializer_class = {s.Meta.model: s for s in serializer_subclasses}.get(
-                model, self.serializer_class
-            )
+        for obj in objects:
+            serializer_class = serializer_classes.get(type(obj), self.serializer_class)
             data.append(serializer_class(obj, context={"request": request}).data)
         return data
 
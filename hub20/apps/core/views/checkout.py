@@ -15,10 +15,10 @@ User = get_user_model()
 class StoreViewSet(GenericViewSet, ListModelMixin, RetrieveModelMixin):
     permission_classes = (AllowAny,)
     serializer_class = serializers.StoreViewerSerializer
-    queryset = models.Store.objects.all()
+    queryset = models.Store.objects.select_related("rsa").defer("rsa__private_key_pem")
 
     def get_object(self, *args, **kw):
-        return get_object_or_404(models.Store, id=self.kwargs["pk"])
+        return get_object_or_404(self.get_queryset(), id=self.kwargs["pk"])
 
 
 class UserStoreViewSet(ModelViewSet):
@@ -29,7 +29,9 @@ class UserStoreViewSet(ModelViewSet):
 
     def get_queryset(self) -> QuerySet:
         try:
-            return self.request.user.store_set.all()
+            return self.request.user.store_set.select_related("rsa", "accepted_token_list").defer(
+                "rsa__private_key_pem"
+            )
         except AttributeError:
             return models.Store.objects.none()
 
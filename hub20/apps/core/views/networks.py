@@ -61,7 +61,8 @@ class PaymentNetworkViewSet(PolymorphicModelViewSet):
 
     @action(detail=True, methods=["GET"], name="Network Status")
     def status(self, request, **kw):
-        network = self.get_object().subclassed
+        # The queryset already selects subclasses, no need to query it again
+        network = self.get_object()
         serializer_class = self.get_serializer_class()
         serializer = serializer_class(network, context={"request": request})
         return Response(serializer.data)
@@ -1,5 +1,12 @@
+from typing import Optional
+
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
 from web3.exceptions import LogTopicError
 
+from ..constants import ERC20_TRANSFER_TOPIC
+
 EIP20_ABI = [
     {
         "constant": True,
@@ -321,3 +328,39 @@ def get_event_abi(abi, event_name):
 TRANSFER_EVENT_ABI = get_event_abi(abi=EIP20_ABI, event_name="Transfer")
 APPROVAL_EVENT_ABI = get_event_abi(abi=EIP20_ABI, event_name="Approval")
 MINT_EVENT_ABI = get_event_abi(abi=ERC223_ABI, event_name="Minted")
+
+TRANSFER_EVENT_TOPIC = HexBytes(ERC20_TRANSFER_TOPIC)
+
+
+def decode_transfer_log(log) -> Optional[AttributeDict]:
+    """
+    Decodes an ERC20 Transfer log without going through the ABI
+    codec. The layout of the event is fixed (sender and recipient as
+    indexed topics, value as the only data word), so we just slice
+    it. Returns None for logs that do not match the layout, like the
+    ERC721 Transfer event, which also indexes the token id.
+    """
+    topics = log["topics"]
+    data = HexBytes(log["data"])
+
+    if len(topics) != 3 or HexBytes(topics[0]) != TRANSFER_EVENT_TOPIC or len(data) != 32:
+        return None
+
+    return AttributeDict(
+        {
+            "args": AttributeDict(
+                {
+                    "_from": to_checksum_address(HexBytes(topics[1])[-20:]),
+                    "_to": to_checksum_address(HexBytes(topics[2])[-20:]),
+                    "_value": int.from_bytes(data, "big"),
+                }
+            ),
+            "event": "Transfer",
+            "logIndex": log["logIndex"],
+            "transactionIndex": log["transactionIndex"],
+            "transactionHash": log["transactionHash"],
+            "address": log["address"],
+            "blockHash": log["blockHash"],
+            "blockNumber": log["blockNumber"],
+        }
+    )
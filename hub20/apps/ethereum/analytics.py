@@ -9,6 +9,8 @@ from redis.connection import parse_url
 logger = logging.getLogger(__name__)
 
 BLOCK_HISTORY_COLLECTION_SIZE = 200
+GAS_PRICE_ESTIMATE_CACHE_KEY_TEMPLATE = "hub20:blockchain:analytics:GAS_PRICE_ESTIMATE_{chain_id}"
+GAS_PRICE_ESTIMATE_CACHE_TIMEOUT = 12
 
 CACHE_CONNECTION_PARAMS = parse_url(settings.CACHE_LOCATION)
 
@@ -56,6 +58,24 @@ def get_historical_block_data(chain_id):
 
 
 def estimate_gas_price(chain_id):
+    # The estimate only changes when a new block is recorded, and
+    # computing it means loading the whole block history from redis.
+    cache_key = GAS_PRICE_ESTIMATE_CACHE_KEY_TEMPLATE.format(chain_id=chain_id)
+    gas_price = cache.get(cache_key)
+
+    if gas_price is None:
+        gas_price = _compute_gas_price_estimate(chain_id)
+        if gas_price is not None:
+            cache.set(cache_key, gas_price, timeout=GAS_PRICE_ESTIMATE_CACHE_TIMEOUT)
+
+    return gas_price
+
+
+def reset_gas_price_estimate(chain_id):
+    cache.delete(GAS_PRICE_ESTIMATE_CACHE_KEY_TEMPLATE.format(chain_id=chain_id))
+
+
+def _compute_gas_price_estimate(chain_id):
     historical_data = get_historical_block_data(chain_id)
     blocks = historical_data.elements()
 
@@ -1,8 +1,13 @@
+import re
 from enum import Enum
 
 NULL_ADDRESS: str = "0x" + "0" * 40
 SENTINEL_ADDRESS: str = "0x" + "0" * 39 + "1"
 
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-fA-F]{40}")
+# User input may leave out the 0x prefix, it is added back by the checksum
+UNPREFIXED_ADDRESS_PATTERN = re.compile(r"(0x)?[0-9a-fA-F]{40}")
+
 # keccak('Transfer(address,address,uint256)')
 ERC20_TRANSFER_TOPIC: str = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
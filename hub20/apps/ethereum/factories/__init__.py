@@ -3,10 +3,10 @@ import os
 import random
 
 import factory
-from eth_account.account import Account
 from faker import Faker
 from faker.providers import BaseProvider
 from hexbytes import HexBytes
+from web3 import Web3
 
 from .blockchain import *  # noqa
 from .checkout import *  # noqa
@@ -17,14 +17,34 @@ from .transfers import *  # noqa
 from .wallets import *  # noqa
 
 
+RANDOM_POOL_SIZE = 32 * 4096
+
+_random_pool = b""
+_random_pool_offset = 0
+
+
+def _random_bytes(size: int) -> bytes:
+    # Addresses and hashes are sliced from a buffer that is refilled with a
+    # single call to os.urandom, instead of reading the OS RNG for each one.
+    global _random_pool, _random_pool_offset
+
+    if _random_pool_offset + size > len(_random_pool):
+        _random_pool = os.urandom(RANDOM_POOL_SIZE)
+        _random_pool_offset = 0
+
+    data = _random_pool[_random_pool_offset : _random_pool_offset + size]
+    _random_pool_offset += size
+    return data
+
+
 class EthereumProvider(BaseProvider):
     def ethereum_address(self):
-        private_key = os.urandom(32)
-        account = Account.from_key(private_key)
-        return account.address
+        # Fake addresses are never used to sign anything, so there is no
+        # need to derive them from a private key.
+        return Web3.toChecksumAddress("0x" + _random_bytes(20).hex())
 
     def hex64(self):
-        return HexBytes(os.urandom(32))
+        return HexBytes(_random_bytes(32))
 
     def uint256(self):
         return decimal.Decimal(random.randint(1, 2**256))
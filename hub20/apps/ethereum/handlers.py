@@ -1,8 +1,9 @@
+import functools
 import logging
 
 from django.contrib.contenttypes.models import ContentType
 from django.db.models.signals import post_save
-from django.db.transaction import atomic
+from django.db.transaction import atomic, on_commit
 from django.dispatch import receiver
 
 from hub20.apps.core.models import get_treasury_account
@@ -24,11 +25,11 @@ from .models import (
     BlockchainTransferConfirmation,
     Chain,
     ChainMetadata,
+    NativeToken,
     Transaction,
     TransactionDataRecord,
     TransactionFee,
     TransferEvent,
-    serialize_web3_data,
 )
 
 logger = logging.getLogger(__name__)
@@ -37,9 +38,10 @@ logger = logging.getLogger(__name__)
 def _check_for_blockchain_payment_confirmations(block_number):
     confirmed_block = block_number - app_settings.Blockchain.minimum_confirmations
 
+    # Confirmation handlers read the currency and the deposit owner of each payment
     unconfirmed_payments = BlockchainPayment.objects.filter(
         confirmation__isnull=True, transaction__block__number__lte=confirmed_block
-    )
+    ).select_related("currency", "route__deposit__user")
 
     for payment in unconfirmed_payments:
         PaymentConfirmation.objects.create(payment=payment)
@@ -49,7 +51,14 @@ def _publish_block_created_event(chain_id, block_data):
     block_number = block_data.get("number")
     routes = BlockchainPaymentRoute.objects.in_chain(chain_id).open(block_number=block_number)
 
-    tasks.notify_block_created.delay(chain_id, serialize_web3_data(block_data))
+    tasks.notify_block_created.delay(
+        chain_id,
+        {
+            "hash": block_data["hash"],
+            "number": block_number,
+            "timestamp": block_data["timestamp"],
+        },
+    )
 
     for checkout in Checkout.objects.filter(order__routes__in=routes):
         logger.debug(
@@ -197,7 +206,7 @@ def on_block_added_publish_expired_blockchain_routes(sender, **kw):
 
     expiring_routes = BlockchainPaymentRoute.objects.filter(
         payment_window__endswith=block_number - 1
-    )
+    ).select_related("network", "account")
 
     for route in expiring_routes:
         publish_checkout_event.delay(
@@ -224,6 +233,29 @@ def on_blockchain_transfer_mined_record_confirmation(sender, **kw):
         BlockchainTransferConfirmation.objects.create(transfer=transfer, transaction=transaction)
 
 
+@receiver(post_save, sender=TransferEvent)
+def on_transfer_event_created_update_wallet_balances(sender, **kw):
+    if not kw["created"]:
+        return
+
+    transfer_event = kw["instance"]
+
+    updates = set()
+    for wallet in BaseWallet.objects.filter(
+        address__in=[transfer_event.sender, transfer_event.recipient]
+    ):
+        updates.add((wallet.id, transfer_event.currency_id))
+        if wallet.address == transfer_event.sender:
+            # The sender also paid for gas
+            native_token_id = NativeToken.objects.values_list("id", flat=True).get(
+                chain__blocks__transactions=transfer_event.transaction_id
+            )
+            updates.add((wallet.id, native_token_id))
+
+    for wallet_id, token_id in updates:
+        on_commit(functools.partial(tasks.schedule_wallet_balance_update, wallet_id, token_id))
+
+
 # Accounting
 @atomic()
 @receiver(post_save, sender=TransferEvent)
@@ -348,6 +380,7 @@ __all__ = [
     "on_block_sealed_publish_block_created_event",
     "on_block_sealed_check_confirmed_payments",
     "on_transfer_event_created_check_for_payments_received",
+    "on_transfer_event_created_update_wallet_balances",
     "on_transfer_event_created_record_book_entries",
     "on_transaction_created_record_fee",
     "on_block_created_check_confirmed_payments",
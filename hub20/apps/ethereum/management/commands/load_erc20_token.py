@@ -21,7 +21,7 @@ class Command(BaseCommand):
         try:
             chain_id = options["chain_id"]
             chain = Chain.objects.get(id=chain_id)
-            provider = Web3Provider.active.get(network__blockchainpaymentnetwork__chain=chain)
+            provider = Web3Provider.for_chain(chain.id).get()
         except Chain.DoesNotExist:
             logger.error(f"Chain {chain_id} not found.")
             sys.exit(-1)
@@ -31,13 +31,14 @@ class Command(BaseCommand):
 
         to_record = set(txs) - set(already_recorded)
 
-        w3 = chain.provider.w3
+        provider = chain.provider
+        w3 = provider.w3
 
         for tx_hash in to_record:
             try:
                 tx_data = w3.eth.get_transaction(tx_hash)
                 tx_receipt = w3.eth.get_transaction_receipt(tx_hash)
-                block_data = w3.eth.get_block(tx_data.blockHash)
+                block_data = provider.get_block_by_hash(tx_data.blockHash)
                 TransactionDataRecord.make(chain_id=chain_id, tx_data=tx_data)
                 Transaction.make(
                     chain_id=chain_id,
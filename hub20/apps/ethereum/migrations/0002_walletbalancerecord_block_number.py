@@ -0,0 +1,38 @@
+# Generated by Django 4.0 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ethereum", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="walletbalancerecord",
+            name="block_number",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "UPDATE ethereum_walletbalancerecord AS record "
+                "SET block_number = block.number "
+                "FROM ethereum_block AS block "
+                "WHERE block.hash = record.block_id"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="walletbalancerecord",
+            name="block_number",
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name="walletbalancerecord",
+            index=models.Index(
+                fields=["wallet", "currency", "-block_number"], name="walletbalance_latest_idx"
+            ),
+        ),
+    ]
@@ -1,10 +1,9 @@
-import functools
 import logging
 import os
-from typing import Optional, TypeVar
+from typing import Any, Dict, Optional, Tuple, TypeVar
 
 from django.db import models
-from django.db.models import Max, Q
+from django.db.models import Max
 from eth_account.account import Account
 from hdwallet import HDWallet
 from hdwallet.symbols import ETH
@@ -26,25 +25,23 @@ class BaseWallet(models.Model):
     objects = InheritanceManager()
 
     def historical_balance(self, token):
-        return self.balance_records.filter(currency=token).order_by("block__number")
+        return self.balance_records.filter(currency=token).order_by("block_number")
 
     def current_balance(self, token):
         return self.historical_balance(token).last()
 
     @property
     def balances(self):
-        # There has to be a better way to convert a ValuesQuerySet
-        # into a Queryset, but for the moment it will be okay.
-        record_qs = self.balance_records.values("currency").annotate(
-            block__number=Max("block__number")
+        # Latest record of each token, resolved by the database in one query
+        latest_records = (
+            self.balance_records.order_by("currency", "-block_number")
+            .distinct("currency")
+            .values("id")
         )
 
-        if not record_qs.exists():
-            return self.balance_records.none()
-
-        filter_q = functools.reduce(lambda x, y: x | y, [Q(**r) for r in record_qs])
-
-        return self.balance_records.filter(amount__gt=0).filter(filter_q)
+        return self.balance_records.filter(id__in=latest_records, amount__gt=0).select_related(
+            "currency"
+        )
 
     @property
     def private_key_bytes(self) -> Optional[bytes]:
@@ -70,9 +67,33 @@ class WalletBalanceRecord(TokenValueModel):
         BaseWallet, related_name="balance_records", on_delete=models.CASCADE
     )
     block = models.ForeignKey(Block, on_delete=models.CASCADE)
+    # Copied from the block, so that finding the latest record does not need a join
+    block_number = models.PositiveIntegerField()
+
+    def save(self, *args, **kw):
+        self.block_number = self.block.number
+        return super().save(*args, **kw)
+
+    @classmethod
+    def get_latest_block_numbers(cls, wallets, tokens) -> Dict[Tuple[int, Any], int]:
+        """
+        Maps each (wallet id, token id) pair to the number of the most
+        recent block where its balance was recorded.
+        """
+        records = (
+            cls.objects.filter(wallet__in=wallets, currency__in=tokens)
+            .values_list("wallet_id", "currency_id")
+            .annotate(latest_block_number=Max("block_number"))
+        )
+        return {(wallet_id, token_id): number for wallet_id, token_id, number in records}
 
     class Meta:
         unique_together = ("wallet", "currency", "block")
+        indexes = [
+            models.Index(
+                fields=["wallet", "currency", "-block_number"], name="walletbalance_latest_idx"
+            )
+        ]
 
 
 class ColdWallet(BaseWallet):
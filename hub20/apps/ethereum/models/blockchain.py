@@ -2,6 +2,7 @@ import datetime
 import json
 import logging
 import uuid
+from typing import Optional
 
 from django.contrib.postgres.fields import ArrayField, HStoreField
 from django.db import models
@@ -34,6 +35,7 @@ class Chain(models.Model):
     def provider(self):
         return (
             self.blockchainpaymentnetwork.providers.select_subclasses()
+            .select_related("network__blockchainpaymentnetwork__chain__native_token")
             .filter(is_active=True)
             .first()
         )
@@ -192,8 +194,10 @@ class Transaction(AbstractTransactionRecord):
         tx_receipt: TxReceipt,
         block_data: BlockData,
         force=False,
+        block: Optional[Block] = None,
     ):
-        block = Block.make(chain_id=chain_id, block_data=block_data)
+        # Callers recording many transactions from one block can pass it in
+        block = block or Block.make(chain_id=chain_id, block_data=block_data)
         action = cls.objects.update_or_create if force else cls.objects.get_or_create
         tx, _ = action(
             block=block,
@@ -1,6 +1,7 @@
 import logging
 
 from django.db import models
+from django.utils.functional import cached_property
 
 from hub20.apps.core.models.networks import PaymentNetwork
 from hub20.apps.core.models.tokens import Token_T
@@ -13,6 +14,17 @@ logger = logging.getLogger(__name__)
 class BlockchainPaymentNetwork(PaymentNetwork):
     chain = models.OneToOneField(Chain, on_delete=models.CASCADE)
 
+    @cached_property
+    def provider(self):
+        # Same lookup as Chain.provider, starting from the network's own
+        # providers so that neither the chain nor the network is loaded again
+        return (
+            self.providers.select_subclasses()
+            .select_related("network__blockchainpaymentnetwork__chain__native_token")
+            .filter(is_active=True)
+            .first()
+        )
+
     def supports_token(self, token: Token_T):
         return token.chain_id == self.chain_id and token.is_listed
 
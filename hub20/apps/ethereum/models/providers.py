@@ -1,31 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import itertools
+import json
 import logging
+import threading
 import time
-from typing import Optional, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import celery_pubsub
+import requests
+from aiohttp import ClientError
+from asgiref.sync import sync_to_async
 from django.db import models
 from django.db.transaction import atomic
 from django.db.utils import IntegrityError
-from requests.exceptions import ConnectionError, HTTPError
-from web3 import Web3
-from web3._utils.events import get_event_data
+from django.utils.functional import cached_property
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout, RetryError
+from urllib3.util.retry import Retry
+from web3 import AsyncHTTPProvider, Web3
 from web3._utils.filters import construct_event_filter_params
+from web3._utils.request import make_post_request
 from web3.datastructures import AttributeDict
-from web3.exceptions import BlockNotFound, ExtraDataLengthError, LogTopicError, TransactionNotFound
-from web3.middleware import geth_poa_middleware
+from web3.eth import AsyncEth
+from web3.exceptions import BlockNotFound, ExtraDataLengthError, TransactionNotFound
+from web3.middleware import async_geth_poa_middleware, geth_poa_middleware
+from web3.net import AsyncNet
 from web3.providers import HTTPProvider, IPCProvider, WebsocketProvider
-from web3.types import TxReceipt
+from web3.types import BlockData, TxReceipt
 
 from hub20.apps.core.models.providers import PaymentNetworkProvider
 from hub20.apps.core.models.tokens import Token_T, TokenAmount
 from hub20.apps.core.tasks import broadcast_event
-from hub20.apps.ethereum.exceptions import Web3TransactionError
+from hub20.apps.ethereum.exceptions import EthereumNodeUnavailable, Web3TransactionError
 
 from .. import analytics
-from ..abi.tokens import EIP20_ABI, ERC223_ABI
+from ..abi.tokens import EIP20_ABI, ERC223_ABI, TRANSFER_EVENT_ABI, decode_transfer_log
 from ..constants import SENTINEL_ADDRESS
 from ..typing import Address
 from .accounts import BaseWallet, EthereumAccount_T
@@ -42,9 +57,60 @@ from .tokens import Erc20Token, EthereumToken_T
 GAS_REQUIRED_FOR_MINT: int = 100_000
 GAS_TRANSFER_LIMIT: int = 200_000
 
+HTTP_POOL_CONNECTIONS: int = 32
+HTTP_POOL_MAXSIZE: int = 64
+HTTP_MAX_RETRIES: int = 3
+MAX_LOG_FETCH_WORKERS: int = 8
+MAX_BATCH_REQUEST_SIZE: int = 100
+BLOCK_CACHE_SIZE: int = 256
+
+# Everything a provider needs to reach its chain (and native token) in one query
+CHAIN_RELATED_LOOKUP = "network__blockchainpaymentnetwork__chain__native_token"
+
 logger = logging.getLogger(__name__)
 
 
+# One session per endpoint, shared by every Web3 instance pointing at it.
+_http_sessions: Dict[str, requests.Session] = {}
+_http_sessions_lock = threading.Lock()
+
+# Blocks fetched by hash, shared by all providers of the same chain.
+_block_cache: OrderedDict = OrderedDict()
+_block_cache_lock = threading.Lock()
+
+# Pooled providers are shared by the log fetching threads.
+_web3_clients_lock = threading.Lock()
+
+
+def _make_http_session() -> requests.Session:
+    # All JSON-RPC calls are POSTs, and some of them (eth_sendRawTransaction)
+    # must not be repeated once the node has seen them. Only retry when the
+    # connection could not be established, i.e. the request was never sent.
+    retry_policy = Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=False,
+        redirect=False,
+        backoff_factor=0.2,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry_policy,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session(provider_url: str) -> requests.Session:
+    with _http_sessions_lock:
+        if provider_url not in _http_sessions:
+            _http_sessions[provider_url] = _make_http_session()
+        return _http_sessions[provider_url]
+
+
 def get_web3(provider_url: str, timeout: int) -> Web3:
     endpoint = urlparse(provider_url)
 
@@ -65,30 +131,40 @@ def get_web3(provider_url: str, timeout: int) -> Web3:
         "wss": ws_connection_params,
     }.get(endpoint.scheme, {})
 
+    if provider_class is HTTPProvider:
+        params["session"] = get_http_session(provider_url)
+
     w3 = Web3(provider_class(provider_url, **params))
     return w3
 
 
-def eip1559_price_strategy(w3: Web3, *args, **kw):
+def get_async_web3(provider_url: str, timeout: int) -> Web3:
+    provider = AsyncHTTPProvider(provider_url, request_kwargs={"timeout": timeout})
+    return Web3(provider, modules={"eth": (AsyncEth,), "net": (AsyncNet,)}, middlewares=[])
+
+
+def eip1559_price_strategy(w3: Web3, *args, chain_id: Optional[int] = None, **kw):
     try:
         current_block = w3.eth.get_block("latest")
         return analytics.recommended_eip1559_gas_price(
             current_block, max_priority_fee=w3.eth.max_priority_fee
         )
     except Exception as exc:
-        chain_id = w3.eth.chain_id
+        chain_id = chain_id or w3.eth.chain_id
         logger.exception(f"Error when getting price estimate for {chain_id}", exc_info=exc)
         return analytics.estimate_gas_price(chain_id)
 
 
-def historical_trend_price_strategy(w3: Web3, *args, **kw):
-    return analytics.estimate_gas_price(w3.eth.chain_id)
+def historical_trend_price_strategy(w3: Web3, *args, chain_id: Optional[int] = None, **kw):
+    return analytics.estimate_gas_price(chain_id or w3.eth.chain_id)
 
 
 class Web3Provider(PaymentNetworkProvider):
     DEFAULT_BLOCK_CREATION_INTERVAL = 10
     DEFAULT_MAX_BLOCK_SCAN_RANGE = 5000
     DEFAULT_REQUEST_TIMEOUT = 15
+    MIN_RETRY_INTERVAL = 2
+    MAX_RETRY_INTERVAL = 60
 
     url = Web3ProviderURLField()
     client_version = models.CharField(max_length=300, null=True)
@@ -108,18 +184,52 @@ class Web3Provider(PaymentNetworkProvider):
         return urlparse(self.url).hostname
 
     @property
+    def supports_async_requests(self):
+        return urlparse(self.url).scheme in ("http", "https")
+
+    @cached_property
     def chain(self):
         return self.network.blockchainpaymentnetwork.chain
 
+    @cached_property
+    def chain_id(self) -> int:
+        return self.network.blockchainpaymentnetwork.chain_id
+
+    @cached_property
+    def _native_token(self):
+        return self.chain.native_token
+
+    @classmethod
+    def for_chain(cls, chain_id: int):
+        return cls.active.select_related(CHAIN_RELATED_LOOKUP).filter(
+            network__blockchainpaymentnetwork__chain_id=chain_id
+        )
+
     @property
     def w3(self):
         if not getattr(self, "_w3", None):
-            self._w3 = self._make_web3()
+            with _web3_clients_lock:
+                if not getattr(self, "_w3", None):
+                    self._w3 = self._make_web3()
         return self._w3
 
+    @property
+    def async_w3(self):
+        if not getattr(self, "_async_w3", None):
+            self._async_w3 = self._make_async_web3()
+        return self._async_w3
+
     def __str__(self):
         return self.hostname
 
+    def _make_async_web3(self) -> Web3:
+        w3 = get_async_web3(provider_url=self.url, timeout=self.DEFAULT_REQUEST_TIMEOUT)
+
+        if self.requires_geth_poa_middleware:
+            w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+
+        return w3
+
     def _make_web3(self) -> Web3:
         w3 = get_web3(provider_url=self.url, timeout=self.DEFAULT_REQUEST_TIMEOUT)
 
@@ -129,12 +239,13 @@ class Web3Provider(PaymentNetworkProvider):
         price_strategy = (
             eip1559_price_strategy if self.supports_eip1559 else historical_trend_price_strategy
         )
-        w3.eth.set_gas_price_strategy(price_strategy)
+        w3.eth.set_gas_price_strategy(functools.partial(price_strategy, chain_id=self.chain_id))
 
         return w3
 
     def _is_node_connected(self):
         logger.debug(f"Checking connection for {self}")
+        is_connected = False
         try:
             is_connected = self.w3.isConnected()
 
@@ -149,7 +260,7 @@ class Web3Provider(PaymentNetworkProvider):
         except ValueError:
             # The node does not support the peer count method. Assume healthy.
             self.supports_peer_count = False
-            self.save()
+            self.save(update_fields=["supports_peer_count"])
         except Exception as exc:
             logger.error(f"Could not check {self.hostname}: {exc}")
             is_connected = False
@@ -170,54 +281,131 @@ class Web3Provider(PaymentNetworkProvider):
 
         return is_synced
 
-    def _check_node_is_connected(self):
-        is_connected = self._is_node_connected()
+    async def _is_node_connected_async(self, is_scaling_network: bool):
+        logger.debug(f"Checking connection for {self}")
+        is_connected = False
+        try:
+            is_connected = await self.async_w3.isConnected()
 
-        if self.connected and not is_connected:
-            logger.info(f"Node {self.hostname} is disconnected")
-            self.connected = False
-            self.save()
-            broadcast_event(
-                event=self.network.EVENT_MESSAGES.PROVIDER_OFFLINE.value,
-                network_id=self.network.id,
-            )
+            if is_scaling_network:
+                return is_connected
 
-        elif is_connected and not self.connected:
-            logger.info(f"Node {self.hostname} is reconnected")
-            self.connected = True
-            self.save()
-            broadcast_event(
-                event=self.network.EVENT_MESSAGES.PROVIDER_ONLINE.value, network=self.network.id
-            )
+            if is_connected and self.supports_peer_count:
+                return is_connected and await self.async_w3.net.peer_count > 0
 
-    def _check_node_is_synced(self):
-        is_synced = self._is_node_synced()
+        except ClientError:
+            is_connected = False
+        except ValueError:
+            # The node does not support the peer count method. Assume healthy.
+            self.supports_peer_count = False
+            await sync_to_async(self.save)(update_fields=["supports_peer_count"])
+        except Exception as exc:
+            logger.error(f"Could not check {self.hostname}: {exc}")
+            is_connected = False
 
-        if self.synced and not is_synced:
-            logger.info(f"Node {self.hostname} is out of sync")
-            self.synced = False
-            self.save()
-            broadcast_event(
-                event=self.network.EVENT_MESSAGES.PROVIDER_OFFLINE.value, network=self.network.id
-            )
+        return is_connected
+
+    async def _is_node_synced_async(self, is_scaling_network: bool):
+        if is_scaling_network:
+            return True
+        try:
+            is_synced = bool(not await self.async_w3.eth.syncing)
+        except (ValueError, AttributeError):
+            # The node does not support the eth_syncing method. Assume healthy.
+            is_synced = True
+        except ClientError as exc:
+            logger.error(f"Failed to connect to {self.hostname}: {exc}")
+            is_synced = False
+
+        return is_synced
+
+    async def _get_block_number_async(self) -> Optional[int]:
+        try:
+            return await self.async_w3.eth.block_number
+        except Exception as exc:
+            logger.error(f"Failed to get block number from {self.hostname}: {exc}")
+            return None
+
+    async def _get_max_priority_fee_async(self) -> Optional[int]:
+        if not self.supports_eip1559:
+            return None
+        try:
+            return await self.async_w3.eth.max_priority_fee
+        except Exception:
+            logger.exception(f"Failed to get max priority fee from {self}")
+            return None
+
+    def _get_block_number(self) -> Optional[int]:
+        try:
+            return self.w3.eth.block_number
+        except Exception as exc:
+            logger.error(f"Failed to get block number from {self.hostname}: {exc}")
+            return None
 
-        elif is_synced and not self.synced:
-            logger.info(f"Node {self.hostname} is back in sync")
-            self.synced = True
-            self.save()
-            broadcast_event(
-                event=self.network.EVENT_MESSAGES.PROVIDER_ONLINE.value, network=self.network.id
+    def _get_max_priority_fee(self) -> Optional[int]:
+        if not self.supports_eip1559:
+            return None
+        try:
+            return self.w3.eth.max_priority_fee
+        except Exception:
+            logger.exception(f"Failed to get max priority fee from {self}")
+            return None
+
+    def _set_status(self, is_connected: bool, is_synced: bool):
+        # Both checks are applied together, so that a tick where the node
+        # changes state results in one save and at most one event.
+        was_online = self.is_online
+        changed_fields = []
+
+        if is_connected != self.connected:
+            logger.info(f"Node {self.hostname} is {'re' if is_connected else 'dis'}connected")
+            self.connected = is_connected
+            changed_fields.append("connected")
+
+        if is_synced != self.synced:
+            logger.info(f"Node {self.hostname} is {'back in' if is_synced else 'out of'} sync")
+            self.synced = is_synced
+            changed_fields.append("synced")
+
+        if not changed_fields:
+            return
+
+        self.save(update_fields=changed_fields)
+
+        if self.is_online != was_online:
+            event = (
+                self.network.EVENT_MESSAGES.PROVIDER_ONLINE
+                if self.is_online
+                else self.network.EVENT_MESSAGES.PROVIDER_OFFLINE
             )
+            broadcast_event(event=event.value, network=self.network.id)
 
     @atomic
-    def _check_chain_reorganization(self):
+    def _check_chain_reorganization(self, block_number: Optional[int] = None):
         if self.is_online:
-            block_number = self.w3.eth.block_number
+            if block_number is None:
+                block_number = self.w3.eth.block_number
             if self.chain.highest_block > block_number:
                 self.chain.blocks.filter(number__gt=block_number).delete()
                 self.chain.highest_block = block_number
                 self.chain.save()
 
+    def get_block_by_hash(self, block_hash) -> BlockData:
+        # Unlike block numbers, a block hash always refers to the same data
+        key = (self.chain_id, block_hash)
+        with _block_cache_lock:
+            if key in _block_cache:
+                _block_cache.move_to_end(key)
+                return _block_cache[key]
+
+        block_data = self.w3.eth.get_block(block_hash)
+
+        with _block_cache_lock:
+            _block_cache[key] = block_data
+            while len(_block_cache) > BLOCK_CACHE_SIZE:
+                _block_cache.popitem(last=False)
+        return block_data
+
     def _extract_transfer_event_from_erc20_token_transfer(self, wallet, event_data):
         sender = event_data.args._from
         recipient = event_data.args._to
@@ -230,7 +418,7 @@ class Web3Provider(PaymentNetworkProvider):
 
                 tx_data = self.w3.eth.get_transaction(event_data.transactionHash)
                 tx_receipt = self.w3.eth.get_transaction_receipt(event_data.transactionHash)
-                block_data = self.w3.eth.get_block(tx_receipt.blockHash)
+                block_data = self.get_block_by_hash(tx_receipt.blockHash)
                 amount = token.from_wei(event_data.args._value)
             except TransactionNotFound:
                 logger.warning(f"Failed to get transaction {event_data.transactionHash.hex()}")
@@ -258,21 +446,41 @@ class Web3Provider(PaymentNetworkProvider):
             except Exception:
                 logger.exception("Failed to create transaction or transfer event")
 
-    def _get_erc20_transfer_events(self, start_block, end_block):
-        contract = self.w3.eth.contract(abi=EIP20_ABI)
-        abi = contract.events.Transfer._get_event_abi()
-
+    def _get_erc20_transfer_logs(self, block_range: Tuple[int, int]):
+        start_block, end_block = block_range
         _, event_filter_params = construct_event_filter_params(
-            abi, self.w3.codec, fromBlock=start_block, toBlock=end_block
+            TRANSFER_EVENT_ABI, self.w3.codec, fromBlock=start_block, toBlock=end_block
         )
-
-        for log in self.w3.eth.get_logs(event_filter_params):
-            try:
-                yield get_event_data(self.w3.codec, abi, log)
-            except LogTopicError:
-                pass
-            except Exception as exc:
-                logger.error(f"Error processing log from {self.hostname}: {exc}")
+        return self.w3.eth.get_logs(event_filter_params)
+
+    def _get_erc20_transfer_events(
+        self, start_block, end_block, pool: Optional[Web3ProviderPool] = None
+    ):
+        # Providers limit the range of blocks that can be queried in a
+        # single request, so we split the range in chunks and fetch them
+        # concurrently, spread over all the providers in the pool.
+        # executor.map preserves the order of the chunks.
+        pool = pool or Web3ProviderPool([self])
+
+        def get_logs(block_range):
+            return pool.execute(lambda provider: provider._get_erc20_transfer_logs(block_range))
+
+        chunk_size = max(1, self.max_block_scan_range)
+        block_ranges = [
+            (chunk_start, min(chunk_start + chunk_size - 1, end_block))
+            for chunk_start in range(start_block, end_block + 1, chunk_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=MAX_LOG_FETCH_WORKERS) as executor:
+            for logs in executor.map(get_logs, block_ranges):
+                for log in logs:
+                    try:
+                        event_data = decode_transfer_log(log)
+                    except Exception as exc:
+                        logger.error(f"Error processing log from {self.hostname}: {exc}")
+                    else:
+                        if event_data is not None:
+                            yield event_data
 
     @atomic()
     def activate(self):
@@ -281,29 +489,40 @@ class Web3Provider(PaymentNetworkProvider):
         )
         similar_providers.update(is_active=False)
         self.is_active = True
-        self.save()
+        self.save(update_fields=["is_active"])
 
     def run_checks(self):
-        self._check_node_is_connected()
-        self._check_node_is_synced()
+        self._set_status(is_connected=self._is_node_connected(), is_synced=self._is_node_synced())
         self._check_chain_reorganization()
 
     def update_stats(self, block_data):
-        chain_id = self.chain.id
-        if self.supports_eip1559:
-            try:
-                analytics.MAX_PRIORITY_FEE_TRACKER.set(chain_id, self.w3.eth.max_priority_fee)
-            except Exception:
-                logger.exception(f"Failed to get max priority fee from {self}")
+        self._record_stats(block_data, max_priority_fee=self._get_max_priority_fee())
+
+    def _record_stats(self, block_data, max_priority_fee: Optional[int] = None):
+        chain_id = self.chain_id
+        if max_priority_fee is not None:
+            analytics.MAX_PRIORITY_FEE_TRACKER.set(chain_id, max_priority_fee)
         try:
             block_history = analytics.get_historical_block_data(chain_id)
             block_history.push(block_data)
         except Exception:
             logger.exception(f"Failed to record historical data about {self.chain.name}")
+        else:
+            analytics.reset_gas_price_estimate(chain_id)
+
+    def _publish_block(self, block_data):
+        celery_pubsub.publish(
+            "blockchain.mined.block",
+            chain_id=self.chain_id,
+            block_data=serialize_web3_data(block_data),
+            provider_url=self.url,
+        )
+        self.chain.highest_block = block_data.number
+        self.chain.save()
 
     def update_configuration(self):
         try:
-            w3 = get_web3(provider_url=self.url, timeout=self.DEFAULT_REQUEST_TIMEOUT)
+            w3 = self.w3
             try:
                 version: Optional[str] = w3.clientVersion
             except ValueError:
@@ -341,11 +560,25 @@ class Web3Provider(PaymentNetworkProvider):
                 else:
                     supports_peer_count = False
 
-            try:
-                w3.eth.get_block("latest")
-                requires_geth_poa_middleware = False
-            except ExtraDataLengthError:
+            # Once the middleware is installed the block will always be
+            # read fine, so we can only probe when it is not there.
+            if self.requires_geth_poa_middleware:
                 requires_geth_poa_middleware = True
+            else:
+                try:
+                    w3.eth.get_block("latest")
+                    requires_geth_poa_middleware = False
+                except ExtraDataLengthError:
+                    requires_geth_poa_middleware = True
+
+            # Middleware and gas price strategy are set when the client
+            # is built, so it needs to be rebuilt if any of them changed
+            if (requires_geth_poa_middleware, eip1559) != (
+                self.requires_geth_poa_middleware,
+                self.supports_eip1559,
+            ):
+                self._w3 = None
+                self._async_w3 = None
 
             self.client_version = version
             self.supports_eip1559 = eip1559
@@ -353,7 +586,15 @@ class Web3Provider(PaymentNetworkProvider):
             self.requires_geth_poa_middleware = requires_geth_poa_middleware
             self.supports_peer_count = supports_peer_count
 
-            self.save()
+            self.save(
+                update_fields=[
+                    "client_version",
+                    "supports_eip1559",
+                    "supports_pending_filters",
+                    "requires_geth_poa_middleware",
+                    "supports_peer_count",
+                ]
+            )
         except Exception as exc:
             logger.exception(f"Failed to update configuration for {self}: {exc}")
 
@@ -394,18 +635,34 @@ class Web3Provider(PaymentNetworkProvider):
         )
 
     def encode_transfer_call(self, recipient_address, amount: TokenAmount):
-        contract = self.w3.eth.contract(address=amount.currency.subclassed.address, abi=EIP20_ABI)
+        # Call data does not depend on the contract address
+        contract = self.w3.eth.contract(abi=EIP20_ABI)
 
         return contract.encodeABI("transfer", [recipient_address, amount.as_wei])
 
-    def extract_native_token_transfers(self, block_data):
+    def extract_native_token_transfers(self, block_data, pool: Optional[Web3ProviderPool] = None):
         transactions = block_data["transactions"]
-        txs = [t for t in transactions if t.value > 0]
+        value_txs = [t for t in transactions if t.value > 0]
+
+        if not value_txs:
+            return
+
+        # Only transactions involving one of our wallets are relevant, so
+        # we look them up in one query before making any RPC call.
+        block_addresses = {t["from"] for t in value_txs} | {t["to"] for t in value_txs}
+        wallets = BaseWallet.objects.in_bulk(
+            [address for address in block_addresses if address], field_name="address"
+        )
+        txs = [t for t in value_txs if t["from"] in wallets or t["to"] in wallets]
 
         if not txs:
             return
 
-        token = self.chain.native_token
+        pool = pool or Web3ProviderPool([self])
+        token = self._native_token
+        block = Block.make(chain_id=token.chain_id, block_data=block_data)
+        WalletTransaction = BaseWallet.transactions.through
+        wallet_transactions = []
 
         for transaction_data in txs:
             sender = transaction_data["from"]
@@ -413,15 +670,21 @@ class Web3Provider(PaymentNetworkProvider):
 
             amount = token.from_wei(transaction_data.value)
 
-            tx_receipt = self.w3.eth.get_transaction_receipt(transaction_data.hash)
+            tx_receipt = pool.execute(
+                lambda provider: provider.w3.eth.get_transaction_receipt(transaction_data.hash)
+            )
             tx = Transaction.make(
                 chain_id=token.chain_id,
                 block_data=block_data,
                 tx_receipt=tx_receipt,
+                block=block,
             )
 
-            for wallet in BaseWallet.objects.filter(address__in=[sender, recipient]):
-                wallet.transactions.add(tx)
+            wallet_transactions.extend(
+                WalletTransaction(basewallet_id=wallets[address].id, transaction_id=tx.id)
+                for address in {sender, recipient}
+                if address in wallets
+            )
 
             try:
                 TransferEvent.objects.get_or_create(
@@ -434,14 +697,23 @@ class Web3Provider(PaymentNetworkProvider):
             except Exception:
                 logger.exception("Failed to create transfer event")
 
+        # No handlers depend on the wallet/transaction links, so they can all
+        # go in a single insert once the transactions are recorded.
+        WalletTransaction.objects.bulk_create(wallet_transactions, ignore_conflicts=True)
+
     def extract_erc20_transfer_events_from_wallet(self, wallet, start_block, end_block):
         for event_data in self._get_erc20_transfer_events(start_block, end_block):
             self._extract_transfer_event_from_erc20_token_transfer(wallet, event_data)
 
     def extract_erc20_token_transfer_events(self, start_block, end_block):
         wallets = list(BaseWallet.objects.all())
+        wallet_addresses = {wallet.address for wallet in wallets}
+        pool = Web3ProviderPool.for_chain(self.chain, provider=self) or Web3ProviderPool([self])
+
+        for event_data in self._get_erc20_transfer_events(start_block, end_block, pool=pool):
+            if not {event_data.args._from, event_data.args._to} & wallet_addresses:
+                continue
 
-        for event_data in self._get_erc20_transfer_events(start_block, end_block):
             for wallet in wallets:
                 self._extract_transfer_event_from_erc20_token_transfer(wallet, event_data)
 
@@ -451,9 +723,53 @@ class Web3Provider(PaymentNetworkProvider):
             {"from": SENTINEL_ADDRESS}
         )
 
+    def _make_batch_request(self, *calls: Tuple[str, List]) -> List:
+        payload = [
+            {"jsonrpc": "2.0", "id": idx, "method": method, "params": params}
+            for idx, (method, params) in enumerate(calls)
+        ]
+        provider = self.w3.provider
+        raw_response = make_post_request(
+            provider.endpoint_uri, json.dumps(payload), **provider.get_request_kwargs()
+        )
+        responses = sorted(json.loads(raw_response), key=lambda response: response["id"])
+
+        errors = [response["error"] for response in responses if "error" in response]
+        if errors:
+            raise ValueError(errors[0])
+
+        return [response["result"] for response in responses]
+
+    def _get_batched_transfer_fee_estimate(self, token: Token_T) -> int:
+        calls = [("eth_getBlockByNumber", ["latest", False]), ("eth_maxPriorityFeePerGas", [])]
+
+        if token.is_ERC20:
+            transfer_call = {
+                "from": SENTINEL_ADDRESS,
+                "to": token.address,
+                "data": self.encode_transfer_call(SENTINEL_ADDRESS, token.from_wei(0)),
+            }
+            calls.append(("eth_estimateGas", [transfer_call]))
+
+        block, max_priority_fee, *gas_estimate = self._make_batch_request(*calls)
+
+        gas_price = analytics.recommended_eip1559_gas_price(
+            AttributeDict({"baseFeePerGas": int(block["baseFeePerGas"], 16)}),
+            max_priority_fee=int(max_priority_fee, 16),
+        )
+        return gas_price * (int(gas_estimate[0], 16) if gas_estimate else 21000)
+
     def get_transfer_fee_estimate(self, token: Token_T) -> TokenAmount:
         native_token = token.chain.native_token
 
+        # With EIP-1559 the gas price and the gas estimate all come from
+        # the node, so we get them all in one round trip when possible.
+        if self.supports_eip1559 and isinstance(self.w3.provider, HTTPProvider):
+            try:
+                return native_token.from_wei(self._get_batched_transfer_fee_estimate(token))
+            except Exception as exc:
+                logger.warning(f"Batched fee estimate failed on {self}: {exc}")
+
         gas_price = self.w3.eth.generate_gas_price()
         gas_estimate = (
             self.get_erc20_token_transfer_gas_estimate(token=token) if token.is_ERC20 else 21000
@@ -468,10 +784,10 @@ class Web3Provider(PaymentNetworkProvider):
         contract_args: Optional[Tuple] = None,
         **kw,
     ) -> TxReceipt:
-        nonce = kw.pop("nonce", self.w3.eth.get_transaction_count(account.address))
+        nonce = kw.pop("nonce", self.w3.eth.get_transaction_count(account.address, "pending"))
 
         transaction_params = {
-            "chainId": int(self.w3.net.version),
+            "chainId": self.chain_id,
             "nonce": nonce,
             "gasPrice": kw.pop("gas_price", self.w3.eth.generate_gas_price()),
             "gas": gas,
@@ -502,26 +818,92 @@ class Web3Provider(PaymentNetworkProvider):
 
             raise Web3TransactionError from exc
 
-    @atomic()
-    def update_account_balance(self, account: EthereumAccount_T, token: EthereumToken_T):
+    def _get_account_balance(self, account: EthereumAccount_T, token: EthereumToken_T):
         current_block = self.w3.eth.block_number
         block_data = self.w3.eth.get_block(current_block)
         if token.is_ERC20:
             contract = self.w3.eth.contract(abi=EIP20_ABI, address=token.address)
             current_balance = contract.functions.balanceOf(account.address).call()
-            balance = token.from_wei(current_balance)
         else:
-            balance = token.from_wei(
-                self.w3.eth.get_balance(account.address, block_identifier=block_data.hash.hex())
+            current_balance = self.w3.eth.get_balance(
+                account.address, block_identifier=block_data.hash.hex()
             )
-        block = Block.make(block_data=block_data, chain_id=self.chain.id)
+        return block_data, current_balance
+
+    @atomic()
+    def update_account_balance(
+        self,
+        account: EthereumAccount_T,
+        token: EthereumToken_T,
+        pool: Optional[Web3ProviderPool] = None,
+    ):
+        # The block and the balance must come from the same node
+        pool = pool or Web3ProviderPool([self])
+        block_data, current_balance = pool.execute(
+            lambda provider: provider._get_account_balance(account, token)
+        )
+        balance = token.from_wei(current_balance)
+        block = Block.make(block_data=block_data, chain_id=self.chain_id)
 
         account.balance_records.create(
             currency=balance.currency, amount=balance.amount, block=block
         )
 
+    def get_erc20_token_balances(
+        self, holdings: List[Tuple[Address, Erc20Token]], block_identifier: int
+    ) -> List[Optional[int]]:
+        """
+        Returns the balance (in wei) of each (address, token) pair at the
+        given block, or None for the pairs that could not be read. With
+        HTTP providers the calls are sent as JSON-RPC batches.
+        """
+
+        contracts = {}
+
+        def get_balance(address, token):
+            if token.address not in contracts:
+                contracts[token.address] = self.w3.eth.contract(
+                    abi=EIP20_ABI, address=token.address
+                )
+            try:
+                return (
+                    contracts[token.address]
+                    .functions.balanceOf(address)
+                    .call(block_identifier=block_identifier)
+                )
+            except Exception as exc:
+                logger.warning(f"Failed to get {token} balance for {address}: {exc}")
+                return None
+
+        if not isinstance(self.w3.provider, HTTPProvider):
+            return [get_balance(address, token) for address, token in holdings]
+
+        contract = self.w3.eth.contract(abi=EIP20_ABI)
+        block_param = hex(block_identifier)
+        balances: List[Optional[int]] = []
+
+        for offset in range(0, len(holdings), MAX_BATCH_REQUEST_SIZE):
+            batch = holdings[offset : offset + MAX_BATCH_REQUEST_SIZE]
+            calls = [
+                (
+                    "eth_call",
+                    [
+                        {"to": token.address, "data": contract.encodeABI("balanceOf", [address])},
+                        block_param,
+                    ],
+                )
+                for address, token in batch
+            ]
+            try:
+                balances.extend(int(result, 16) for result in self._make_batch_request(*calls))
+            except Exception as exc:
+                logger.warning(f"Batched balance request failed on {self}: {exc}")
+                balances.extend(get_balance(address, token) for address, token in batch)
+
+        return balances
+
     def select_for_transfer(self, amount: TokenAmount) -> Union[EthereumAccount_T, None]:
-        native_token = self.chain.native_token
+        native_token = self._native_token
         transferred_token = amount.currency.subclassed
 
         assert (
@@ -535,13 +917,15 @@ class Web3Provider(PaymentNetworkProvider):
         if is_native_token_transfer:
             amount += transfer_fee
 
+        pool = Web3ProviderPool.for_chain(self.chain, provider=self)
+
         for account in BaseWallet.objects.select_subclasses().order_by("?"):
             if not hasattr(account, "private_key"):
                 logger.debug(f"Can not use {account.address} for transfers")
                 continue
-            self.update_account_balance(account=account, token=native_token)
+            self.update_account_balance(account=account, token=native_token, pool=pool)
             if not is_native_token_transfer:
-                self.update_account_balance(account=account, token=transferred_token)
+                self.update_account_balance(account=account, token=transferred_token, pool=pool)
 
             token_balance = account.current_balance(transferred_token)
             native_token_balance = account.current_balance(native_token)
@@ -560,14 +944,20 @@ class Web3Provider(PaymentNetworkProvider):
     ) -> TransactionDataRecord:
         token: EthereumToken_T = amount.currency.subclassed
 
-        chain_id = self.chain.id
+        chain_id = self.chain_id
 
         message = f"Connected to network {chain_id}, token {token.symbol} is on {token.chain_id}"
         assert token.chain_id == chain_id, message
 
+        # Counting pending transactions lets consecutive transfers from the
+        # same account go out before the previous ones are mined.
+        nonce = kw.pop("nonce", None)
+        if nonce is None:
+            nonce = self.w3.eth.get_transaction_count(account.address, "pending")
+
         transaction_params = {
             "chainId": chain_id,
-            "nonce": self.w3.eth.get_transaction_count(account.address),
+            "nonce": nonce,
             "gasPrice": self.w3.eth.generate_gas_price(),
             "gas": GAS_TRANSFER_LIMIT,
             "from": account.address,
@@ -585,14 +975,13 @@ class Web3Provider(PaymentNetworkProvider):
             transaction_params.update({"to": address, "value": amount.as_wei})
 
         signed_tx = self.sign_transaction(account=account, transaction_data=transaction_params)
-        chain_id = self.chain.id
         tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
         try:
             tx_data = self.w3.eth.get_transaction(tx_hash)
             return TransactionDataRecord.make(chain_id=chain_id, tx_data=tx_data, force=True)
         except TransactionNotFound:
             return TransactionDataRecord.make(
-                chain_id=chain_id, tx_data=AttributeDict(transaction_params)
+                chain_id=chain_id, tx_data=AttributeDict({**transaction_params, "hash": tx_hash})
             )
 
     def sign_transaction(self, account: EthereumAccount_T, transaction_data, *args, **kw):
@@ -600,42 +989,151 @@ class Web3Provider(PaymentNetworkProvider):
             raise NotImplementedError(f"{account} can not sign transactions")
         return self.w3.eth.account.signTransaction(transaction_data, account.private_key)
 
+    def _update_status(
+        self, is_connected: bool, is_synced: bool, current_block: Optional[int]
+    ) -> bool:
+        # Everything a loop iteration does with the results of the health
+        # checks, regardless of how they were fetched. Returns whether the
+        # node can be used to get new blocks.
+        self._set_status(is_connected=is_connected, is_synced=is_synced)
+
+        if not self.is_online or current_block is None:
+            return False
+
+        self._check_chain_reorganization(block_number=current_block)
+        return True
+
+    def _process_block(self, block_data, max_priority_fee: Optional[int] = None):
+        self._record_stats(block_data, max_priority_fee=max_priority_fee)
+        self._publish_block(block_data)
+
+    def _tick(self) -> bool:
+        current_block = self._get_block_number()
+        if not self._update_status(
+            self._is_node_connected(), self._is_node_synced(), current_block
+        ):
+            return False
+
+        if current_block > self.chain.highest_block:
+            try:
+                logger.debug(f"Getting block {current_block} from {self.hostname}")
+                block_data = self.w3.eth.get_block(current_block, full_transactions=True)
+            except BlockNotFound:
+                logger.warning(f"Failed to get block {current_block} from {self}")
+            else:
+                self._process_block(block_data, max_priority_fee=self._get_max_priority_fee())
+        return True
+
+    async def _tick_async(self, is_scaling_network: bool) -> bool:
+        # All the health checks are independent RPC calls, so we
+        # make them concurrently and only hit the database after.
+        is_connected, is_synced, current_block = await asyncio.gather(
+            self._is_node_connected_async(is_scaling_network),
+            self._is_node_synced_async(is_scaling_network),
+            self._get_block_number_async(),
+        )
+        if not await sync_to_async(self._update_status)(is_connected, is_synced, current_block):
+            return False
+
+        highest_block = await sync_to_async(lambda: self.chain.highest_block)()
+        if current_block > highest_block:
+            try:
+                logger.debug(f"Getting block {current_block} from {self.hostname}")
+                block_data, max_priority_fee = await asyncio.gather(
+                    self.async_w3.eth.get_block(current_block, full_transactions=True),
+                    self._get_max_priority_fee_async(),
+                )
+            except BlockNotFound:
+                logger.warning(f"Failed to get block {current_block} from {self}")
+            else:
+                await sync_to_async(self._process_block)(
+                    block_data, max_priority_fee=max_priority_fee
+                )
+        return True
+
     def run(self):
-        MIN_TIMEOUT = 2
-        MAX_TIMEOUT = 60
-        self.update_configuration()
+        if self.supports_async_requests:
+            return asyncio.run(self.run_async())
 
-        timeout = MIN_TIMEOUT
+        self.update_configuration()
+        timeout = self.MIN_RETRY_INTERVAL
 
         while True:
-            self.run_checks()
-
-            if self.is_online:
-                timeout = MIN_TIMEOUT
+            if self._tick():
+                timeout = self.MIN_RETRY_INTERVAL
+                time.sleep(1)
             else:
                 logger.warning(f"{self} is not online. Sleeping {timeout} seconds...")
                 time.sleep(timeout)
-                timeout = min(MAX_TIMEOUT, 2 * timeout)
-                continue
+                timeout = min(self.MAX_RETRY_INTERVAL, 2 * timeout)
 
-            current_block = self.w3.eth.block_number
-            if current_block > self.chain.highest_block:
-                try:
-                    logger.debug(f"Getting block {current_block} from {self.hostname}")
-                    block_data = self.w3.eth.get_block(current_block, full_transactions=True)
-                    self.update_stats(block_data)
-                except BlockNotFound:
-                    logger.warning(f"Failed to get block {current_block} from {self}")
-                else:
-                    celery_pubsub.publish(
-                        "blockchain.mined.block",
-                        chain_id=self.w3.eth.chain_id,
-                        block_data=serialize_web3_data(block_data),
-                        provider_url=self.url,
-                    )
-                    self.chain.highest_block = current_block
-                    self.chain.save()
-            time.sleep(1)
+    async def run_async(self):
+        await sync_to_async(self.update_configuration)()
+
+        is_scaling_network = await sync_to_async(lambda: self.chain.is_scaling_network)()
+        timeout = self.MIN_RETRY_INTERVAL
+
+        while True:
+            if await self._tick_async(is_scaling_network):
+                timeout = self.MIN_RETRY_INTERVAL
+                await asyncio.sleep(1)
+            else:
+                logger.warning(f"{self} is not online. Sleeping {timeout} seconds...")
+                await asyncio.sleep(timeout)
+                timeout = min(self.MAX_RETRY_INTERVAL, 2 * timeout)
+
+
+class Web3ProviderPool:
+    """
+    Distributes calls over all the healthy providers of a chain in
+    round-robin. When a provider fails with a connection error, it is
+    taken out of the rotation and the call is retried with the next
+    one. The pool does not change the status of the providers on the
+    database, that is left for the health checks on each provider.
+    """
+
+    RECOVERABLE_ERRORS = (ConnectionError, HTTPError, ReadTimeout, RetryError, TimeoutError)
+
+    def __init__(self, providers):
+        self.providers = list(providers)
+        self._unavailable = set()
+        self._rotation = itertools.cycle(self.providers)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.providers) - len(self._unavailable)
+
+    @classmethod
+    def for_chain(cls, chain, provider: Optional[Web3Provider] = None) -> Web3ProviderPool:
+        # The calling provider takes the place of its own row, so that its
+        # web3 client is reused instead of being built again for every scan.
+        return cls(
+            provider if provider is not None and provider.id == available.id else available
+            for available in Web3Provider.for_chain(chain.id).filter(connected=True, synced=True)
+        )
+
+    def _next_provider(self) -> Optional[Web3Provider]:
+        with self._lock:
+            for _ in range(len(self.providers)):
+                provider = next(self._rotation)
+                if provider.id not in self._unavailable:
+                    return provider
+            return None
+
+    def execute(self, func):
+        last_error = None
+        provider = self._next_provider()
+        while provider is not None:
+            try:
+                return func(provider)
+            except self.RECOVERABLE_ERRORS as exc:
+                logger.warning(f"{provider} failed, taking it out of the pool: {exc}")
+                with self._lock:
+                    self._unavailable.add(provider.id)
+                last_error = exc
+            provider = self._next_provider()
+
+        raise EthereumNodeUnavailable("No provider available to process request") from last_error
 
 
-__all__ = ["Web3Provider"]
+__all__ = ["Web3Provider", "Web3ProviderPool"]
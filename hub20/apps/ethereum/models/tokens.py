@@ -1,19 +1,24 @@
 import json
 import logging
-from typing import Union
+from typing import List, Union
 
 import requests
 from django.db import models
+from django.db.transaction import atomic
+from web3 import Web3
 
 from hub20.apps.core.models import BaseToken, TokenList
 
 from ..constants import NULL_ADDRESS
-from ..schemas import TokenList as TokenListSchema, validate_token_list
+from ..schemas import validate_token_list
+from ..schemas.tokenlist import TokenInfo, TokenListVersionModel
 from .blockchain import Chain
 from .fields import EthereumAddressField
 
 logger = logging.getLogger(__name__)
 
+TOKENLIST_BATCH_SIZE = 500
+
 
 # Tokens
 class NativeToken(BaseToken):
@@ -58,6 +63,36 @@ class Erc20Token(BaseToken):
         obj, _ = cls.objects.update_or_create(address=address, chain=chain, defaults=defaults)
         return obj
 
+    @classmethod
+    def _add_tokenlist_entries(cls, token_list: TokenList, entries: List[TokenInfo]):
+        token_entries = {
+            (entry.chainId, Web3.toChecksumAddress(entry.address)): entry for entry in entries
+        }
+
+        existing_tokens = {
+            (token.chain_id, token.address): token
+            for token in cls.objects.filter(
+                chain_id__in={chain_id for chain_id, _ in token_entries},
+                address__in={address for _, address in token_entries},
+            )
+        }
+
+        # Erc20Token uses multi-table inheritance, so bulk_create is not
+        # available. We still only hit the database for missing tokens.
+        with atomic():
+            for (chain_id, address), token_entry in token_entries.items():
+                if (chain_id, address) not in existing_tokens:
+                    existing_tokens[(chain_id, address)] = cls.objects.create(
+                        chain_id=chain_id,
+                        address=address,
+                        name=token_entry.name,
+                        decimals=token_entry.decimals,
+                        symbol=token_entry.symbol,
+                        logoURI=token_entry.logoURI,
+                    )
+
+            token_list.tokens.add(*[existing_tokens[key] for key in token_entries])
+
     @classmethod
     def load_tokenlist(cls, url, description=None):
         response = requests.get(url)
@@ -74,29 +109,25 @@ class Erc20Token(BaseToken):
 
         validate_token_list(response_data)
 
-        token_list_data: TokenListSchema = TokenListSchema(**response_data)
+        version = TokenListVersionModel(**response_data["version"])
 
         token_list, _ = TokenList.objects.get_or_create(
             url=url,
-            version=token_list_data.version.as_string,
-            defaults=dict(name=token_list_data.name),
+            version=version.as_string,
+            defaults=dict(name=response_data["name"]),
         )
         token_list.description = description
-        token_list.keywords.add(*token_list_data.keywords)
+        token_list.keywords.add(*response_data.get("keywords", []))
         token_list.save()
 
-        for token_entry in token_list_data.tokens:
-            token, _ = cls.objects.get_or_create(
-                chain_id=token_entry.chainId,
-                address=token_entry.address,
-                defaults=dict(
-                    name=token_entry.name,
-                    decimals=token_entry.decimals,
-                    symbol=token_entry.symbol,
-                    logoURI=token_entry.logoURI,
-                ),
-            )
-            token_list.tokens.add(token)
+        # The raw JSON is still fully loaded in memory. Batching only bounds
+        # how many TokenInfo objects exist at once and the size of the
+        # lookup queries for each batch.
+        token_entries = response_data["tokens"]
+        for offset in range(0, len(token_entries), TOKENLIST_BATCH_SIZE):
+            batch = token_entries[offset : offset + TOKENLIST_BATCH_SIZE]
+            cls._add_tokenlist_entries(token_list, [TokenInfo(**entry) for entry in batch])
+
         return token_list
 
     class Meta:
@@ -12,7 +12,7 @@ Wallet = get_wallet_model()
 class WalletBalanceSerializer(serializers.ModelSerializer):
     token = HyperlinkedRelatedTokenField(source="currency")
     balance = TokenValueField(source="amount")
-    block = serializers.IntegerField(source="block.number", read_only=True)
+    block = serializers.IntegerField(source="block_number", read_only=True)
 
     class Meta:
         model = WalletBalanceRecord
@@ -4,6 +4,8 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from web3 import Web3
 
+from ..constants import NULL_ADDRESS, SENTINEL_ADDRESS, UNPREFIXED_ADDRESS_PATTERN
+
 
 class AddressSerializerField(serializers.Field):
     """
@@ -20,16 +22,19 @@ class AddressSerializerField(serializers.Field):
         return obj
 
     def to_internal_value(self, data):
-        try:
-            if int(data, 16) == 0 and not self.allow_zero_address:
-                raise ValidationError("0x0 address is not allowed")
-            elif int(data, 16) == 1 and not self.allow_sentinel_address:
-                raise ValidationError("0x1 address is not allowed")
-
-            return Web3.toChecksumAddress(data)
-        except Exception:
+        # Cheap format check first, the checksum needs a keccak hash
+        if not isinstance(data, str) or not UNPREFIXED_ADDRESS_PATTERN.fullmatch(data):
             raise ValidationError("Address %s is not valid" % data)
 
+        address = Web3.toChecksumAddress(data)
+
+        if address == NULL_ADDRESS and not self.allow_zero_address:
+            raise ValidationError("0x0 address is not allowed")
+        elif address == SENTINEL_ADDRESS and not self.allow_sentinel_address:
+            raise ValidationError("0x1 address is not allowed")
+
+        return address
+
 
 # ================================================ #
 #                Custom Fields
@@ -8,11 +8,13 @@ from ..models import BlockchainPaymentNetwork
 
 class BlockchainPaymentNetworkSerializer(PaymentNetworkSerializer):
     short_name = serializers.CharField(source="chain.info.short_name")
-    chain_id = serializers.IntegerField(source="chain.id")
+    chain_id = serializers.IntegerField(read_only=True)
     token = serializers.HyperlinkedRelatedField(
         view_name="token-detail", source="chain.native_token", read_only=True
     )
 
+    related_lookups = ("chain__info", "chain__native_token")
+
     class Meta:
         model = BlockchainPaymentNetwork
         fields = read_only_fields = PaymentNetworkSerializer.Meta.fields + (
@@ -24,8 +26,8 @@ class BlockchainPaymentNetworkSerializer(PaymentNetworkSerializer):
 
 class BlockchainStatusSerializer(PaymentNetworkStatusSerializer):
     height = serializers.IntegerField(source="chain.highest_block", read_only=True)
-    online = serializers.BooleanField(source="chain.provider.connected")
-    synced = serializers.BooleanField(source="chain.provider.synced")
+    online = serializers.BooleanField(source="provider.connected")
+    synced = serializers.BooleanField(source="provider.synced")
     gas_price_estimate = serializers.SerializerMethodField()
 
     def get_gas_price_estimate(self, obj):
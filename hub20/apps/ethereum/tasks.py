@@ -1,107 +1,219 @@
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 import celery_pubsub
-from celery import shared_task
-from web3.datastructures import AttributeDict
+from celery import group, shared_task
+from django.core.cache import cache
+from django.db import IntegrityError
+from hexbytes import HexBytes
 
+from hub20.apps.core.models import BaseToken
 from hub20.apps.core.tasks import broadcast_event
 
-from .abi.tokens import EIP20_ABI
 from .constants import Events
-from .models import BaseWallet, Block, WalletBalanceRecord, Web3Provider
+from .models import BaseWallet, Block, WalletBalanceRecord, Web3Provider, Web3ProviderPool
 from .signals import block_sealed
 
 logger = logging.getLogger(__name__)
 
+WALLET_BALANCE_UPDATE_CACHE_KEY_TEMPLATE = (
+    "hub20:blockchain:wallet_balance_update:{wallet_id}:{token_id}"
+)
+WALLET_BALANCE_UPDATE_LOCK_TIMEOUT = 60
+
 
 @shared_task
 def notify_block_created(chain_id, block_data):
     logger.debug(f"Broadcast event of new block on #{chain_id}")
-    block_data = AttributeDict(block_data)
     broadcast_event(
         event=Events.BLOCK_CREATED.value,
         chain_id=chain_id,
-        hash=block_data.hash,
-        number=block_data.number,
-        timestamp=block_data.timestamp,
+        hash=block_data["hash"],
+        number=block_data["number"],
+        timestamp=block_data["timestamp"],
     )
 
 
 # Tasks that are setup to subscribe and handle events generated by the event streams
 @shared_task
 def notify_new_block(chain_id, block_data: Dict, provider_url):
-    block_data = AttributeDict(block_data)
+    # block_data is already serialized by the provider, receivers only index it as a dict
     logger.debug(f"Sending notification of new block on chain #{chain_id}")
     block_sealed.send(sender=Block, chain_id=chain_id, block_data=block_data)
 
 
+def schedule_wallet_balance_update(wallet_id, token_id):
+    # Bursts of transfer events for the same wallet and token only need one
+    # update. The key is cleared when the task starts, so events that come
+    # after that schedule a new one instead of being lost.
+    cache_key = WALLET_BALANCE_UPDATE_CACHE_KEY_TEMPLATE.format(
+        wallet_id=wallet_id, token_id=token_id
+    )
+    if cache.add(cache_key, True, timeout=WALLET_BALANCE_UPDATE_LOCK_TIMEOUT):
+        update_wallet_balance.delay(wallet_id, token_id)
+
+
+@shared_task
+def update_wallet_balance(wallet_id, token_id):
+    cache.delete(
+        WALLET_BALANCE_UPDATE_CACHE_KEY_TEMPLATE.format(wallet_id=wallet_id, token_id=token_id)
+    )
+
+    try:
+        wallet = BaseWallet.objects.get_subclass(id=wallet_id)
+        token = BaseToken.objects.get_subclass(id=token_id)
+    except (BaseWallet.DoesNotExist, BaseToken.DoesNotExist):
+        logger.warning(f"Can not update balance of wallet {wallet_id} for token {token_id}")
+        return
+
+    provider = token.chain.provider
+    if provider is None or not provider.is_online:
+        logger.info(f"No provider available to update {token} balance of {wallet.address}")
+        return
+
+    pool = Web3ProviderPool.for_chain(token.chain, provider=provider)
+
+    try:
+        provider.update_account_balance(account=wallet, token=token, pool=pool)
+    except IntegrityError:
+        # Balance was already recorded for the current block
+        pass
+    except Exception:
+        logger.exception(f"Failed to get {token} balance for {wallet.address}")
+
+
+def _get_block(provider: Web3Provider, block_number: int) -> Block:
+    # Both balance tasks run on the same block, so whichever comes second
+    # can take it from the database instead of asking the node again.
+    blocks = list(Block.objects.filter(chain_id=provider.chain_id, number=block_number)[:2])
+    if len(blocks) == 1:
+        return blocks[0]
+
+    block_data = provider.w3.eth.get_block(block_number)
+    return Block.make(block_data=block_data, chain_id=provider.chain_id)
+
+
+def _get_provider(provider_id) -> Optional[Web3Provider]:
+    try:
+        return Web3Provider.available.get(id=provider_id)
+    except Web3Provider.DoesNotExist:
+        logger.warning(f"Provider {provider_id} is not available")
+        return None
+
+
+@shared_task
+def update_provider_erc20_token_balances(provider_id):
+    provider = _get_provider(provider_id)
+    if provider is None:
+        return
+
+    try:
+        current_block = provider.w3.eth.block_number
+    except Exception:
+        logger.exception(f"Failed to get block info on {provider}")
+        return
+
+    wallets = list(BaseWallet.objects.all())
+    tokens = list(provider.chain.tokens.all())
+    latest_blocks = WalletBalanceRecord.get_latest_block_numbers(wallets, tokens)
+    outdated = [
+        (wallet, token)
+        for wallet in wallets
+        for token in tokens
+        if latest_blocks.get((wallet.id, token.id), -1) < current_block
+    ]
+
+    if not outdated:
+        return
+
+    try:
+        block = _get_block(provider, current_block)
+    except Exception:
+        logger.exception(f"Failed to get block {current_block} on {provider}")
+        return
+
+    balances = provider.get_erc20_token_balances(
+        [(wallet.address, token) for wallet, token in outdated],
+        block_identifier=current_block,
+    )
+
+    WalletBalanceRecord.objects.bulk_create(
+        [
+            WalletBalanceRecord(
+                wallet=wallet,
+                currency=token,
+                amount=token.from_wei(balance).amount,
+                block=block,
+                block_number=block.number,
+            )
+            for (wallet, token), balance in zip(outdated, balances)
+            if balance is not None
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
 @shared_task
 def update_wallet_erc20_token_balances():
-    for provider in Web3Provider.available.all():
+    # Each chain is independent, so they are processed concurrently by the workers
+    provider_ids = Web3Provider.available.values_list("id", flat=True)
+    group(update_provider_erc20_token_balances.s(provider_id) for provider_id in provider_ids)()
+
+
+@shared_task
+def update_provider_native_token_balances(provider_id):
+    provider = _get_provider(provider_id)
+    if provider is None:
+        return
+
+    try:
+        current_block = provider.w3.eth.block_number
+    except Exception:
+        logger.exception(f"Failed to get block info on {provider}")
+        return
+
+    wallets = list(BaseWallet.objects.all())
+    token = provider.chain.native_token
+    latest_blocks = WalletBalanceRecord.get_latest_block_numbers(wallets, [token])
+    outdated = [
+        wallet
+        for wallet in wallets
+        if latest_blocks.get((wallet.id, token.id), -1) < current_block
+    ]
+
+    if not outdated:
+        return
+
+    try:
+        block = _get_block(provider, current_block)
+    except Exception:
+        logger.exception(f"Failed to get block {current_block} on {provider}")
+        return
+
+    for wallet in outdated:
         try:
-            current_block = provider.w3.eth.block_number
+            balance = token.from_wei(
+                provider.w3.eth.get_balance(
+                    wallet.address, block_identifier=HexBytes(block.hash).hex()
+                )
+            )
+
+            WalletBalanceRecord.objects.create(
+                wallet=wallet,
+                currency=balance.currency,
+                amount=balance.amount,
+                block=block,
+            )
+
         except Exception:
-            logger.exception(f"Failed to get block info on {provider}")
-            continue
-
-        for wallet in BaseWallet.objects.all():
-            for token in provider.chain.tokens.all():
-                last_recorded_balance = wallet.current_balance(token)
-                last_recorded_block = last_recorded_balance and last_recorded_balance.block
-
-                if last_recorded_block is None or last_recorded_block.number < current_block:
-                    try:
-                        contract = provider.w3.eth.contract(abi=EIP20_ABI, address=token.address)
-                        current_balance = contract.functions.balanceOf(wallet.address).call()
-                        balance_amount = token.from_wei(current_balance)
-                        block_data = provider.w3.eth.get_block(current_block)
-                        block = Block.make(block_data=block_data, chain_id=token.chain_id)
-
-                        WalletBalanceRecord.objects.create(
-                            wallet=wallet,
-                            currency=balance_amount.currency,
-                            amount=balance_amount.amount,
-                            block=block,
-                        )
-                    except Exception:
-                        logger.exception(f"Failed to get {token} balance for {wallet.address}")
+            logger.exception(f"Failed to get {token} balance for {wallet.address}")
 
 
 @shared_task
 def update_wallet_native_token_balances():
-    for provider in Web3Provider.available.all():
-        try:
-            current_block = provider.w3.eth.block_number
-        except Exception:
-            logger.exception(f"Failed to get block info on {provider}")
-            continue
-
-        for wallet in BaseWallet.objects.all():
-            token = provider.chain.native_token
-            last_recorded_balance = wallet.current_balance(token)
-            last_recorded_block = last_recorded_balance and last_recorded_balance.block
-
-            if last_recorded_block is None or last_recorded_block.number < current_block:
-                try:
-                    block_data = provider.w3.eth.get_block(current_block)
-                    balance = token.from_wei(
-                        provider.w3.eth.get_balance(
-                            wallet.address, block_identifier=block_data.hash.hex()
-                        )
-                    )
-
-                    block = Block.make(block_data=block_data, chain_id=token.chain_id)
-
-                    WalletBalanceRecord.objects.create(
-                        wallet=wallet,
-                        currency=balance.currency,
-                        amount=balance.amount,
-                        block=block,
-                    )
-
-                except Exception:
-                    logger.exception(f"Failed to get {token} balance for {wallet.address}")
+    provider_ids = Web3Provider.available.values_list("id", flat=True)
+    group(update_provider_native_token_balances.s(provider_id) for provider_id in provider_ids)()
 
 
 celery_pubsub.subscribe("blockchain.mined.block", notify_new_block)
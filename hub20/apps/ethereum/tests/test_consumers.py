@@ -11,7 +11,7 @@ from hub20.apps.core.handlers.payments import (
 from hub20.apps.core.settings import app_settings
 from hub20.apps.core.tests.asgi import application
 
-from ..abi.tokens import EIP20_ABI
+from ..abi.tokens import decode_transfer_log
 from ..constants import Events
 from ..factories import (
     BlockFactory,
@@ -26,7 +26,7 @@ from ..handlers import (
     on_chain_updated_check_payment_confirmations,
     on_incoming_transfer_broadcast_notify_open_checkouts,
 )
-from ..models import BaseWallet, Block, Chain
+from ..models import Block, BlockchainPaymentRoute, Chain
 from ..signals import block_sealed
 from .mocks import BlockMock, Erc20TokenTransferDataMock, Erc20TokenTransferReceiptMock
 
@@ -42,12 +42,31 @@ def is_hex_string(value: str):
         return False
 
 
+async def drain_messages(communicator, expected=1, timeout=0.25, idle_timeout=0.05):
+    # Waits the full timeout only until the expected messages arrive, after
+    # that a short idle period is enough to catch any extra ones.
+    messages = []
+    while True:
+        wait = idle_timeout if len(messages) >= expected else timeout
+        if await communicator.receive_nothing(timeout=wait):
+            return messages
+        messages.append(await communicator.receive_json_from())
+
+
+def deposit_route(payment_request):
+    return (
+        BlockchainPaymentRoute.objects.filter(deposit=payment_request)
+        .select_related("account")
+        .first()
+    )
+
+
 def deposit_account(payment_request):
-    return BaseWallet.objects.filter(blockchain_routes__deposit=payment_request).first()
+    return deposit_route(payment_request).account
 
 
-def deposit_transaction_params(payment_request):
-    route = payment_request.routes.select_subclasses().first()
+def deposit_transaction_params(payment_request, route=None):
+    route = route or deposit_route(payment_request)
     return dict(
         blockNumber=payment_request.currency.chain.highest_block,
         recipient=route.account.address,
@@ -55,6 +74,11 @@ def deposit_transaction_params(payment_request):
     )
 
 
+def deposit_account_and_transaction_params(payment_request):
+    route = deposit_route(payment_request)
+    return route.account, deposit_transaction_params(payment_request, route=route)
+
+
 def deposit_tx_data(deposit_tx_params):
     return Erc20TokenTransferDataMock(**deposit_tx_params)
 
@@ -78,18 +102,52 @@ def deposit_block_data(tx_data):
 
 
 def erc20_deposit_transfer_events(tx_data, tx_params):
-    w3 = Web3()
     tx_receipt = deposit_tx_receipt(tx_data, tx_params)
-    contract = w3.eth.contract(address=tx_receipt.to, abi=EIP20_ABI)
-    return contract.events.Transfer().processReceipt(tx_receipt)
+    events = (decode_transfer_log(log) for log in tx_receipt.logs)
+    return tuple(event for event in events if event is not None)
+
+
+# Consumers and the wrapped receivers below query the database from other
+# threads, which only see committed rows. That is why every test here needs
+# django_db(transaction=True) rather than the savepoint-based default.
+
+# Signal receivers run synchronously and touch the database, so the tests
+# call them through these wrappers.
+send_block_sealed = sync_to_async(block_sealed.send)
+broadcast_payment_received = sync_to_async(on_payment_received_broadcast_event)
+notify_checkout_payment_received = sync_to_async(on_payment_received_notify_checkout)
+notify_checkout_transfer_broadcast = sync_to_async(
+    on_incoming_transfer_broadcast_notify_open_checkouts
+)
+check_payment_confirmations = sync_to_async(on_chain_updated_check_payment_confirmations)
 
 
 @pytest.fixture
-def session_events_communicator(client):
+async def session_events_communicator(client):
+    # Connects when requested, so tests should list it after the fixtures
+    # that create data, or it will also receive the events they trigger.
     communicator = WebsocketCommunicator(application, "events")
     communicator.scope["session"] = client.session
 
-    return communicator
+    ok, protocol_or_error = await communicator.connect()
+    assert ok, "Failed to connect"
+
+    yield communicator
+
+    await communicator.disconnect()
+
+
+@pytest.fixture
+async def checkout_communicator(checkout):
+    # Same as session_events_communicator: list it after the data fixtures
+    communicator = WebsocketCommunicator(application, f"checkout/{checkout.id}")
+
+    ok, protocol_or_error = await communicator.connect()
+    assert ok, "Failed to connect"
+
+    yield communicator
+
+    await communicator.disconnect()
 
 
 @pytest.fixture
@@ -153,21 +211,13 @@ def erc20_blockchain_checkout_payment(checkout):
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_session_erc20_token_deposit_received(
-    session_events_communicator, erc20_blockchain_payment, network_event_messages
+    erc20_blockchain_payment, network_event_messages, session_events_communicator
 ):
-
-    ok, protocol_or_error = await session_events_communicator.connect()
-    assert ok, "Failed to connect"
-
-    await sync_to_async(on_payment_received_broadcast_event)(
+    await broadcast_payment_received(
         sender=erc20_blockchain_payment.__class__, payment=erc20_blockchain_payment
     )
 
-    messages = []
-    while not await session_events_communicator.receive_nothing(timeout=0.25):
-        messages.append(await session_events_communicator.receive_json_from())
-
-    await session_events_communicator.disconnect()
+    messages = await drain_messages(session_events_communicator)
 
     assert len(messages) != 0, "we should have received something here"
     payment_received_event = network_event_messages.DEPOSIT_RECEIVED.value
@@ -186,21 +236,13 @@ async def test_session_erc20_token_deposit_received(
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_session_native_token_deposit_received(
-    session_events_communicator, ether_blockchain_payment, network_event_messages
+    ether_blockchain_payment, network_event_messages, session_events_communicator
 ):
-
-    ok, protocol_or_error = await session_events_communicator.connect()
-    assert ok, "Failed to connect"
-
-    await sync_to_async(on_payment_received_broadcast_event)(
+    await broadcast_payment_received(
         sender=ether_blockchain_payment.__class__, payment=ether_blockchain_payment
     )
 
-    messages = []
-    while not await session_events_communicator.receive_nothing(timeout=0.25):
-        messages.append(await session_events_communicator.receive_json_from())
-
-    await session_events_communicator.disconnect()
+    messages = await drain_messages(session_events_communicator)
 
     assert len(messages) != 0, "we should have received something here"
     payment_received_event = network_event_messages.DEPOSIT_RECEIVED.value
@@ -219,24 +261,15 @@ async def test_session_native_token_deposit_received(
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_checkout_receives_block_created_notification(
-    checkout, erc20_blockchain_checkout_payment
+    checkout, erc20_blockchain_checkout_payment, checkout_communicator
 ):
-    communicator = WebsocketCommunicator(application, f"checkout/{checkout.id}")
-
-    ok, protocol_or_error = await communicator.connect()
-    assert ok, "Failed to connect"
-
     block_data = BlockMock()
 
-    await sync_to_async(block_sealed.send)(
+    await send_block_sealed(
         sender=Block, chain_id=checkout.order.currency.chain_id, block_data=block_data
     )
 
-    messages = []
-    while not await communicator.receive_nothing(timeout=0.25):
-        messages.append(await communicator.receive_json_from())
-
-    await communicator.disconnect()
+    messages = await drain_messages(checkout_communicator)
 
     assert len(messages) != 0, "we should have received something here"
 
@@ -249,24 +282,13 @@ async def test_checkout_receives_block_created_notification(
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_checkout_receives_deposit_received_notification(
-    checkout, erc20_blockchain_checkout_payment, network_event_messages
+    checkout, erc20_blockchain_checkout_payment, network_event_messages, checkout_communicator
 ):
-    communicator = WebsocketCommunicator(application, f"checkout/{checkout.id}")
-
-    ok, protocol_or_error = await communicator.connect()
-    assert ok, "Failed to connect"
-
     payment = erc20_blockchain_checkout_payment
 
-    await sync_to_async(on_payment_received_notify_checkout)(
-        sender=payment.__class__, payment=payment
-    )
+    await notify_checkout_payment_received(sender=payment.__class__, payment=payment)
 
-    messages = []
-    while not await communicator.receive_nothing(timeout=0.25):
-        messages.append(await communicator.receive_json_from())
-
-    await communicator.disconnect()
+    messages = await drain_messages(checkout_communicator)
 
     assert len(messages) != 0, "we should have received something here"
     payment_mined_event = network_event_messages.DEPOSIT_RECEIVED.value
@@ -282,30 +304,20 @@ async def test_checkout_receives_deposit_received_notification(
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_checkout_receives_transaction_broadcast_notification(
-    checkout, erc20_blockchain_checkout_payment
+    checkout, erc20_blockchain_checkout_payment, checkout_communicator
 ):
-    communicator = WebsocketCommunicator(application, f"checkout/{checkout.id}")
-
-    ok, protocol_or_error = await communicator.connect()
-    assert ok, "Failed to connect"
-
     order = checkout.order
-    account = await sync_to_async(deposit_account)(order)
-    tx_params = await sync_to_async(deposit_transaction_params)(order)
+    account, tx_params = await sync_to_async(deposit_account_and_transaction_params)(order)
     tx_data = deposit_tx_data(tx_params)
 
-    await sync_to_async(on_incoming_transfer_broadcast_notify_open_checkouts)(
+    await notify_checkout_transfer_broadcast(
         sender=tx_data.__class__,
         account=account,
         amount=order.as_token_amount,
         transaction_data=tx_data,
     )
 
-    messages = []
-    while not await communicator.receive_nothing(timeout=0.25):
-        messages.append(await communicator.receive_json_from())
-
-    await communicator.disconnect()
+    messages = await drain_messages(checkout_communicator)
 
     assert len(messages) != 0, "we should have received something here"
     payment_sent_event = Events.DEPOSIT_BROADCAST.value
@@ -321,28 +333,21 @@ async def test_checkout_receives_transaction_broadcast_notification(
 @pytest.mark.asyncio
 @pytest.mark.django_db(transaction=True)
 async def test_checkout_receives_confirmation_notification(
-    checkout, erc20_blockchain_checkout_payment, treasury, network_event_messages
+    checkout,
+    erc20_blockchain_checkout_payment,
+    treasury,
+    network_event_messages,
+    checkout_communicator,
 ):
-    communicator = WebsocketCommunicator(application, f"checkout/{checkout.id}")
-
-    ok, protocol_or_error = await communicator.connect()
-    assert ok, "Failed to connect"
-
     tx_block_number = erc20_blockchain_checkout_payment.transaction.block.number
     confirmation_block_number = tx_block_number + app_settings.Blockchain.minimum_confirmations
 
     block = await sync_to_async(BlockFactory)(number=confirmation_block_number)
     block.chain.highest_block = confirmation_block_number
 
-    await sync_to_async(on_chain_updated_check_payment_confirmations)(
-        sender=Chain, instance=block.chain
-    )
+    await check_payment_confirmations(sender=Chain, instance=block.chain)
 
-    messages = []
-    while not await communicator.receive_nothing(timeout=0.25):
-        messages.append(await communicator.receive_json_from())
-
-    await communicator.disconnect()
+    messages = await drain_messages(checkout_communicator)
 
     assert len(messages) != 0, "we should have received something here"
     payment_confirmed_event = network_event_messages.DEPOSIT_CONFIRMED.value
@@ -12,10 +12,15 @@ from ..models import BlockchainPaymentRoute, Erc20Token
 
 
 class PaymentOrderManagerTestCase(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         InternalPaymentNetworkFactory()
-        self.route = Erc20TokenBlockchainPaymentRouteFactory()
-        self.order = self.route.deposit
+        cls.route = Erc20TokenBlockchainPaymentRouteFactory()
+        cls.order = cls.route.deposit
+
+    def _is_route_open(self):
+        # Filtering first keeps the payment totals of open() to this route
+        return BlockchainPaymentRoute.objects.filter(id=self.route.id).open().exists()
 
     def test_order_with_partial_payment_is_open(self):
         partial_payment_amount = self.order.as_token_amount * 0.5
@@ -24,13 +29,13 @@ class PaymentOrderManagerTestCase(TestCase):
         )
 
         PaymentConfirmation.objects.create(payment=payment)
-        self.assertTrue(BlockchainPaymentRoute.objects.open().exists())
+        self.assertTrue(self._is_route_open())
 
     def test_order_with_unconfirmed_payment_is_open(self):
         Erc20TokenBlockchainPaymentFactory(
             route=self.route, payment_amount=self.order.as_token_amount
         )
-        self.assertTrue(BlockchainPaymentRoute.objects.open().exists())
+        self.assertTrue(self._is_route_open())
 
     def test_order_with_multiple_payments_is_not_open(self):
         partial_payment_amount = self.order.as_token_amount * 0.5
@@ -38,26 +43,27 @@ class PaymentOrderManagerTestCase(TestCase):
             route=self.route, payment_amount=partial_payment_amount
         )
         PaymentConfirmation.objects.create(payment=first_payment)
-        self.assertTrue(BlockchainPaymentRoute.objects.open().exists())
+        self.assertTrue(self._is_route_open())
 
         second_payment = Erc20TokenBlockchainPaymentFactory(
             route=self.route, payment_amount=partial_payment_amount
         )
         PaymentConfirmation.objects.create(payment=second_payment)
-        self.assertFalse(BlockchainPaymentRoute.objects.open().exists())
+        self.assertFalse(self._is_route_open())
 
     def test_order_with_confirmed_payment_is_not_open(self):
         payment = Erc20TokenBlockchainPaymentFactory(
             route=self.route, payment_amount=self.order.as_token_amount
         )
         PaymentConfirmation.objects.create(payment=payment)
-        self.assertFalse(BlockchainPaymentRoute.objects.open().exists())
+        self.assertFalse(self._is_route_open())
 
 
 class TokenManagerTestCase(TestCase):
-    def setUp(self):
-        self.listed_token = Erc20TokenFactory()
-        self.unlisted_token = Erc20TokenFactory(is_listed=False)
+    @classmethod
+    def setUpTestData(cls):
+        cls.listed_token = Erc20TokenFactory()
+        cls.unlisted_token = Erc20TokenFactory(is_listed=False)
 
     def test_tradeable_manager_works_on_derived_classes(self):
         self.assertEqual(Erc20Token.tradeable.count(), 1)
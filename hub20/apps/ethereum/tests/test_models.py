@@ -1,9 +1,9 @@
-from unittest.mock import patch
+from unittest.mock import DEFAULT, patch
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from web3 import Web3
 
 from hub20.apps.core.choices import TRANSFER_STATUS
@@ -17,6 +17,7 @@ from ..factories import (
     BlockchainPaymentNetworkFactory,
     BlockchainTransferConfirmationFactory,
     BlockchainTransferFactory,
+    BlockFactory,
     Erc20TokenBlockchainPaymentFactory,
     Erc20TokenBlockchainPaymentRouteFactory,
     Erc20TokenFactory,
@@ -27,19 +28,30 @@ from ..factories import (
     EtherAmountFactory,
     EtherPaymentConfirmationFactory,
     WalletBalanceRecordFactory,
+    Web3ProviderFactory,
+)
+from ..models import (
+    Block,
+    BlockchainPayment,
+    BlockchainTransfer,
+    Transaction,
+    TransactionFee,
+    WalletBalanceRecord,
+    Web3Provider,
+    Web3ProviderPool,
 )
-from ..models import Block, BlockchainPayment, Web3Provider
 from ..signals import block_sealed
 from .mocks import BlockMock
 from .utils import add_eth_to_account, add_token_to_account
 
 
 class BlockchainPaymentTestCase(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         InternalPaymentNetworkFactory()
-        self.blockchain_route = Erc20TokenBlockchainPaymentRouteFactory()
-        self.order = self.blockchain_route.deposit
-        self.chain = self.blockchain_route.chain
+        cls.blockchain_route = Erc20TokenBlockchainPaymentRouteFactory()
+        cls.order = cls.blockchain_route.deposit
+        cls.chain = cls.blockchain_route.chain
 
     def test_transaction_sets_payment_as_received(self):
         Erc20TokenTransferEventFactory(
@@ -139,6 +151,12 @@ class BlockchainTransferTestCase(TransferModelTestCase):
 
 
 class Web3AccountingTestCase(AccountingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        content_types = ContentType.objects.get_for_models(Transaction, TransactionFee)
+        cls.transaction_type = content_types[Transaction]
+        cls.transaction_fee_type = content_types[TransactionFee]
+
     def setUp(self):
         super().setUp()
         self.wallet = BaseWalletFactory()
@@ -157,9 +175,10 @@ class Web3AccountingTestCase(AccountingTestCase):
         transfer = BlockchainTransferFactory(
             sender=self.user, currency=self.credit.currency, amount=self.credit.amount
         )
+        transfer_amount = transfer.as_token_amount
 
         payout_tx_data = Erc20TokenTransactionDataFactory(
-            amount=transfer.as_token_amount,
+            amount=transfer_amount,
             recipient=transfer.address,
             from_address=self.wallet.address,
         )
@@ -172,7 +191,7 @@ class Web3AccountingTestCase(AccountingTestCase):
         # Transfer is executed, now we generate the transaction to create confirmation
         payout_tx = Erc20TokenTransactionFactory(
             hash=payout_tx_data.hash,
-            amount=transfer.as_token_amount,
+            amount=transfer_amount,
             recipient=transfer.address,
             from_address=self.wallet.address,
         )
@@ -180,12 +199,13 @@ class Web3AccountingTestCase(AccountingTestCase):
         self.wallet.transactions.add(payout_tx)
         BlockchainTransferConfirmationFactory(transfer=transfer, transaction=payout_tx)
 
-        transaction_type = ContentType.objects.get_for_model(payout_tx)
-
-        blockchain_credit = self.blockchain_account.credits.filter(
-            reference_type=transaction_type
-        ).last()
-        treasury_debit = self.treasury.debits.filter(reference_type=transaction_type).last()
+        with self.assertNumQueries(2):
+            blockchain_credit = self.blockchain_account.credits.filter(
+                reference_type=self.transaction_type
+            ).last()
+            treasury_debit = self.treasury.debits.filter(
+                reference_type=self.transaction_type
+            ).last()
 
         self.assertIsNotNone(treasury_debit)
         self.assertIsNotNone(blockchain_credit)
@@ -196,45 +216,55 @@ class Web3AccountingTestCase(AccountingTestCase):
         transfer = BlockchainTransferFactory(
             sender=self.user, currency=self.credit.currency, amount=self.credit.amount
         )
+        transfer_amount = transfer.as_token_amount
 
-        with patch.object(Web3Provider, "select_for_transfer") as select:
-            with patch.object(Web3Provider, "transfer") as web3_transfer_execute:
-                payout_tx_data = Erc20TokenTransactionDataFactory(
-                    amount=transfer.as_token_amount,
-                    recipient=transfer.address,
-                    from_address=self.wallet.address,
-                )
-                select.return_value = Web3Provider(self.wallet)
-                web3_transfer_execute.return_value = payout_tx_data
-                transfer.execute()
+        with patch.multiple(Web3Provider, select_for_transfer=DEFAULT, transfer=DEFAULT) as mocks:
+            payout_tx_data = Erc20TokenTransactionDataFactory(
+                amount=transfer_amount,
+                recipient=transfer.address,
+                from_address=self.wallet.address,
+            )
+            mocks["select_for_transfer"].return_value = Web3Provider(self.wallet)
+            mocks["transfer"].return_value = payout_tx_data
+            transfer.execute()
 
         payout_tx = Erc20TokenTransactionFactory(
             hash=payout_tx_data.hash,
-            amount=transfer.as_token_amount,
+            amount=transfer_amount,
             recipient=transfer.address,
             from_address=self.wallet.address,
         )
 
         BlockchainTransferConfirmationFactory(transfer=transfer, transaction=payout_tx)
 
-        self.assertTrue(hasattr(transfer, "confirmation"))
-        self.assertTrue(hasattr(transfer.confirmation, "blockchaintransferconfirmation"))
+        # Load the whole path to the fee at once instead of one lazy query per hop
+        transfer = BlockchainTransfer.objects.select_related(
+            "confirmation__blockchaintransferconfirmation__transaction__fee__currency",
+            "sender__account",
+        ).get(id=transfer.id)
 
-        transaction_fee = transfer.confirmation.blockchaintransferconfirmation.transaction.fee
-        transaction_fee_type = ContentType.objects.get_for_model(transaction_fee)
+        confirmation = getattr(transfer, "confirmation", None)
+        self.assertIsNotNone(confirmation)
+        self.assertIsNotNone(getattr(confirmation, "blockchaintransferconfirmation", None))
+
+        transaction_fee = confirmation.blockchaintransferconfirmation.transaction.fee
         native_token = transaction_fee.currency
 
         sender_book = transfer.sender.account.get_book(token=native_token)
 
-        entry_filters = dict(reference_type=transaction_fee_type, reference_id=transaction_fee.id)
+        entry_filters = dict(
+            reference_type=self.transaction_fee_type, reference_id=transaction_fee.id
+        )
 
-        self.assertIsNotNone(sender_book.debits.filter(**entry_filters).last())
-        self.assertIsNotNone(self.blockchain_account.credits.filter(**entry_filters).last())
+        with self.assertNumQueries(2):
+            self.assertIsNotNone(sender_book.debits.filter(**entry_filters).last())
+            self.assertIsNotNone(self.blockchain_account.credits.filter(**entry_filters).last())
 
 
 class TransferEventTestCase(TestCase):
-    def setUp(self):
-        self.transfer_event = Erc20TokenTransferEventFactory()
+    @classmethod
+    def setUpTestData(cls):
+        cls.transfer_event = Erc20TokenTransferEventFactory()
 
     def test_can_get_token_amount(self):
         self.assertIsNotNone(self.transfer_event.as_token_amount)
@@ -247,40 +277,69 @@ class WalletTestCase(TestCase):
     def test_address_is_checksummed(self):
         self.assertTrue(Web3.isChecksumAddress(self.wallet.address))
 
-    def test_can_read_current_balances(self):
-        first_token = Erc20TokenFactory()
-        second_token = Erc20TokenFactory()
-        third_token = Erc20TokenFactory()
+    def _build_balance_record(self, token, block):
+        # bulk_create skips save(), so block_number needs to be set explicitly
+        return WalletBalanceRecordFactory.build(
+            wallet=self.wallet, currency=token, block=block, block_number=block.number
+        )
 
-        WalletBalanceRecordFactory(wallet=self.wallet, currency=first_token, block__number=1)
-        WalletBalanceRecordFactory(wallet=self.wallet, currency=second_token, block__number=1)
+    def test_can_read_current_balances(self):
+        first_token, second_token, third_token = Erc20TokenFactory.create_batch(3)
 
-        # Let's create two more records for each token
-        updated_first = WalletBalanceRecordFactory(
-            wallet=self.wallet, currency=first_token, block__number=5
-        )
-        updated_second = WalletBalanceRecordFactory(
-            wallet=self.wallet, currency=second_token, block__number=20
+        blocks = {
+            block.number: block
+            for block in Block.objects.bulk_create(
+                [BlockFactory.build(chain=first_token.chain, number=n) for n in (1, 5, 20)]
+            )
+        }
+
+        # Two records for each token, only the latest ones are current
+        updated_first, updated_second = WalletBalanceRecord.objects.bulk_create(
+            [
+                self._build_balance_record(first_token, blocks[1]),
+                self._build_balance_record(second_token, blocks[1]),
+                self._build_balance_record(first_token, blocks[5]),
+                self._build_balance_record(second_token, blocks[20]),
+            ]
+        )[2:]
+
+        balances = set(self.wallet.balances.values_list("pk", flat=True))
+        self.assertEqual(len(balances), 2)
+        self.assertIn(updated_first.pk, balances)
+        self.assertIn(updated_second.pk, balances)
+
+        _, updated_third = WalletBalanceRecord.objects.bulk_create(
+            [
+                self._build_balance_record(third_token, blocks[5]),
+                self._build_balance_record(third_token, blocks[20]),
+            ]
         )
 
-        self.assertEqual(self.wallet.balances.count(), 2)
-        self.assertTrue(updated_first in self.wallet.balances)
-        self.assertTrue(updated_second in self.wallet.balances)
+        balances = set(self.wallet.balances.values_list("pk", flat=True))
+        self.assertEqual(len(balances), 3)
+        self.assertIn(updated_first.pk, balances)
+        self.assertIn(updated_second.pk, balances)
+        self.assertIn(updated_third.pk, balances)
 
-        WalletBalanceRecordFactory(wallet=self.wallet, currency=third_token, block__number=5)
-        updated_third = WalletBalanceRecordFactory(
-            wallet=self.wallet, currency=third_token, block__number=20
-        )
 
-        self.assertEqual(self.wallet.balances.count(), 3)
-        self.assertTrue(updated_first in self.wallet.balances)
-        self.assertTrue(updated_second in self.wallet.balances)
-        self.assertTrue(updated_third in self.wallet.balances)
+class Web3ProviderPoolTestCase(TestCase):
+    def setUp(self):
+        self.provider = Web3ProviderFactory()
+        self.chain = self.provider.chain
+
+    def test_pool_reuses_calling_provider(self):
+        pool = Web3ProviderPool.for_chain(self.chain, provider=self.provider)
+        self.assertEqual(len(pool), 1)
+        self.assertIs(pool.providers[0], self.provider)
+
+    def test_pool_ignores_inactive_providers(self):
+        Web3Provider.objects.filter(id=self.provider.id).update(is_active=False)
+        self.assertEqual(len(Web3ProviderPool.for_chain(self.chain)), 0)
 
 
-class BlockchainPaymentNetworkTestCase(TestCase):
+class BlockchainPaymentNetworkTestCase(SimpleTestCase):
     def test_payment_network_has_correct_type(self):
-        network = BlockchainPaymentNetworkFactory()
+        network = BlockchainPaymentNetworkFactory.build()
         self.assertEqual(network.type, "ethereum")
 
 
@@ -291,4 +350,5 @@ __all__ = [
     "Web3AccountingTestCase",
     "TransferEventTestCase",
     "WalletTestCase",
+    "Web3ProviderPoolTestCase",
 ]
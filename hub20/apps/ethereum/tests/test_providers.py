@@ -0,0 +1,60 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from ..factories import Web3ProviderFactory
+from .mocks import BlockMock
+
+
+def _resolved(value):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
+
+
+def make_async_web3_mock(is_connected=True, block_number=1, block_data=None):
+    # Properties of the async client (block_number, syncing, etc) are
+    # awaited directly, so they are mocked with already resolved futures.
+    w3 = MagicMock()
+    w3.isConnected = AsyncMock(return_value=is_connected)
+    w3.net.peer_count = _resolved(3)
+    w3.eth.syncing = _resolved(False)
+    w3.eth.block_number = _resolved(block_number)
+    w3.eth.get_block = AsyncMock(return_value=block_data)
+    return w3
+
+
+@pytest.fixture
+def provider():
+    return Web3ProviderFactory(url="https://web3.example.com")
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_async_tick_publishes_new_block(provider):
+    block_data = BlockMock(number=1)
+    provider._async_w3 = make_async_web3_mock(block_number=1, block_data=block_data)
+    is_scaling_network = await sync_to_async(lambda: provider.chain.is_scaling_network)()
+
+    with patch("hub20.apps.ethereum.models.providers.celery_pubsub.publish") as publish:
+        assert await provider._tick_async(is_scaling_network)
+
+    provider._async_w3.eth.get_block.assert_awaited_once_with(1, full_transactions=True)
+    publish.assert_called_once()
+    assert provider.chain.highest_block == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_async_tick_marks_disconnected_provider(provider):
+    provider._async_w3 = make_async_web3_mock(is_connected=False)
+    is_scaling_network = await sync_to_async(lambda: provider.chain.is_scaling_network)()
+
+    with patch("hub20.apps.ethereum.models.providers.broadcast_event"):
+        assert not await provider._tick_async(is_scaling_network)
+
+    await sync_to_async(provider.refresh_from_db)()
+    assert not provider.connected
+    provider._async_w3.eth.get_block.assert_not_awaited()
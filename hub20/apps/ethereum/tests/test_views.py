@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
@@ -6,6 +8,7 @@ from hub20.apps.core.factories import PaymentConfirmationFactory, UserFactory
 from hub20.apps.core.tests import BaseTransferTestCase
 
 from ..factories import FAKER
+from ..factories.blockchain import TEST_CHAIN_ID, SyncedChainFactory
 from ..factories.checkout import Erc20TokenCheckoutFactory
 from ..factories.networks import BlockchainPaymentNetworkFactory
 from ..factories.tokens import Erc20TokenFactory
@@ -13,12 +16,13 @@ from ..factories.transfers import BlockchainTransferFactory
 
 
 class CheckoutRoutesViewTestCase(TestCase):
-    def setUp(self):
-        self.checkout = Erc20TokenCheckoutFactory()
-        self.network = BlockchainPaymentNetworkFactory()
-        network_url = reverse("network-detail", kwargs={"pk": self.network.pk})
-        self.post_data = {"network": network_url}
-        self.url = reverse("checkout-routes-list", kwargs={"checkout_pk": self.checkout.pk})
+    @classmethod
+    def setUpTestData(cls):
+        cls.checkout = Erc20TokenCheckoutFactory()
+        cls.network = BlockchainPaymentNetworkFactory()
+        network_url = reverse("network-detail", kwargs={"pk": cls.network.pk})
+        cls.post_data = {"network": network_url}
+        cls.url = reverse("checkout-routes-list", kwargs={"checkout_pk": cls.checkout.pk})
 
     def test_can_add_route(self):
         response = self.client.post(self.url, self.post_data)
@@ -33,17 +37,34 @@ class CheckoutRoutesViewTestCase(TestCase):
 
 
 class BlockchainPaymentNetworkViewTestCase(TestCase):
-    def setUp(self):
-        self.blockchain_network = BlockchainPaymentNetworkFactory()
-        self.client = APIClient()
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.blockchain_network = BlockchainPaymentNetworkFactory()
+        cls.list_url = reverse("network-list")
 
     def test_endpoint_to_list_networks(self):
-        response = self.client.get(reverse("network-list"))
+        response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data), 1)
 
+    def test_list_endpoint_does_not_query_per_network(self):
+        # The first request also warms up caches, so it is not measured
+        self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as single_network_queries:
+            self.client.get(self.list_url)
+
+        for chain_id in (TEST_CHAIN_ID + 1, TEST_CHAIN_ID + 2):
+            BlockchainPaymentNetworkFactory(chain=SyncedChainFactory(id=chain_id))
+
+        with self.assertNumQueries(len(single_network_queries)):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(len(response.data), 3)
+
     def test_filter_on_list_endpoint(self):
-        response = self.client.get(reverse("network-list"), {"available": True})
+        response = self.client.get(self.list_url, {"available": True})
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data), 1)
 
@@ -55,14 +76,22 @@ class BlockchainPaymentNetworkViewTestCase(TestCase):
 
 
 class BlockchainWithdrawalViewTestCase(BaseTransferTestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = Erc20TokenFactory()
+        cls.network = BlockchainPaymentNetworkFactory(chain=cls.token.chain)
+        cls.target_address = FAKER.ethereum_address()
+        cls.transfers_url = reverse(
+            "network-transfers-list", kwargs={"network_pk": cls.network.pk}
+        )
+        cls.token_url = reverse("token-detail", kwargs={"pk": cls.token.pk})
+
     def setUp(self):
         super().setUp()
         self.user = UserFactory()
-        self.client = APIClient()
         self.client.force_authenticate(user=self.user)
-        self.token = Erc20TokenFactory()
-        self.network = BlockchainPaymentNetworkFactory(chain=self.token.chain)
-        self.target_address = FAKER.ethereum_address()
 
     def test_get_blockchain_serializer_on_polymorphic_endpoint(self):
         transfer = BlockchainTransferFactory(sender=self.user, address=self.target_address)
@@ -75,12 +104,12 @@ class BlockchainWithdrawalViewTestCase(BaseTransferTestCase):
 
     def test_no_balance_returns_error(self):
         response = self.client.post(
-            reverse("network-transfers-list", kwargs={"network_pk": self.network.pk}),
+            self.transfers_url,
             {
                 "address": self.target_address,
                 "payment_network": "blockchain",
                 "amount": 10,
-                "token": reverse("token-detail", kwargs=dict(pk=self.token.pk)),
+                "token": self.token_url,
             },
         )
         self.assertEqual(response.status_code, 400)
@@ -101,15 +130,12 @@ class BlockchainWithdrawalViewTestCase(BaseTransferTestCase):
         )
 
         response = self.client.post(
-            reverse("network-transfers-list", kwargs={"network_pk": self.network.pk}),
+            self.transfers_url,
             {
                 "address": self.target_address,
                 "payment_network": "blockchain",
                 "amount": TRANSFER_AMOUNT,
-                "token": reverse(
-                    "token-detail",
-                    kwargs=dict(pk=self.token.pk),
-                ),
+                "token": self.token_url,
             },
         )
         self.assertEqual(response.status_code, 400)
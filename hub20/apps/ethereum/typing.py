@@ -1,10 +1,12 @@
-from typing import NewType, Union
+from typing import TYPE_CHECKING, NewType, Union
 
 from hexbytes import HexBytes
 
-from .models.fields import EthereumAddressField
+if TYPE_CHECKING:
+    # Importing the field at runtime would load the whole models package
+    from .models.fields import EthereumAddressField
 
-Address = Union[str, EthereumAddressField]
+Address = Union[str, "EthereumAddressField"]
 
 ChainID_T = int
 ChainID = NewType("ChainID", ChainID_T)
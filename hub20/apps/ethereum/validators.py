@@ -1,21 +1,24 @@
 from django.core.exceptions import ValidationError
-from web3 import Web3
+from eth_utils import is_checksum_address
 
 from hub20.apps.core.validators import uri_parsable_scheme_validator
 
+from .constants import ADDRESS_PATTERN
+
 
 def validate_checksumed_address(address):
-    try:
-        if not Web3.isChecksumAddress(address):
-            raise ValidationError(
-                "%(address)s has an invalid checksum",
-                params={"address": address},
-            )
-    except Exception:
+    # Malformed values are rejected before paying for the keccak hash
+    if not isinstance(address, str) or not ADDRESS_PATTERN.fullmatch(address):
         raise ValidationError(
             "%(address)s is not a valid ethereum address",
             params={"address": address},
         )
 
+    if not is_checksum_address(address):
+        raise ValidationError(
+            "%(address)s has an invalid checksum",
+            params={"address": address},
+        )
+
 
 web3_url_validator = uri_parsable_scheme_validator(("http", "https", "ws", "wss", "ipc"))